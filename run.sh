@@ -42,7 +42,7 @@ function print_usage() {
 
 function run_tests() {
     echo "Running validation tests..."
-    python tests/test_black_scholes.py
+    python -m pytest -n auto tests/test_black_scholes.py
 }
 
 function test_serial() {
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Ahead-of-Time Build of the Variance Reduction Kernels
+
+Compiles the antithetic payoff kernel and the control-variate kernel from
+variance_reduction into a native extension module (variance_kernels) with
+numba.pycc, so importing processes skip JIT compilation entirely. This
+matters most for MPI jobs, where every rank would otherwise compile (or
+load from the on-disk cache) the kernels on its own.
+
+AOT code is compiled without parallel=True, so the exported kernels run
+on one thread. That suits MPI runs (one single-threaded rank per core) but
+not a standalone multi-core run, so variance_reduction only uses the
+built module when MCHPC_USE_AOT=1 is set and keeps the @njit kernels
+otherwise. numba.pycc is deprecated upstream and may be removed in a
+future Numba release.
+
+Usage:
+    python src/build_kernels.py [output_dir]
+    MCHPC_USE_AOT=1 srun python src/mpi_monte_carlo.py ...
+"""
+
+import os
+import sys
+
+from numba.pycc import CC
+
+from variance_reduction import _anti_kernel, _cv
+
+# Signatures: (S0, S0_neg, K, drift, diff, Z, out_pos, out_neg)
+ANTI_KERNEL_SIGNATURES = {
+    'anti_kernel_f32': 'void(f4, f4, f4, f4, f4, f4[:], f4[:], f4[:])',
+    'anti_kernel_f64': 'void(f8, f8, f8, f8, f8, f8[:], f8[:], f8[:])',
+}
+
+# Signature: (payoffs, control_values, control_mean) -> adjusted mean
+CV_SIGNATURE = 'f8(f8[:], f8[:], f8)'
+
+
+def build(output_dir: str = os.path.dirname(os.path.abspath(__file__))) -> None:
+    """
+    Compile the variance_kernels extension module.
+
+    Args:
+        output_dir: Directory the extension is written to (defaults to src/,
+                    next to variance_reduction.py)
+    """
+    cc = CC('variance_kernels')
+    cc.output_dir = output_dir
+
+    # Export the pure-Python bodies of the @njit kernels so the AOT and
+    # JIT paths are compiled from the same source
+    for name, signature in ANTI_KERNEL_SIGNATURES.items():
+        cc.export(name, signature)(_anti_kernel.py_func)
+    cc.export('cv_f64', CV_SIGNATURE)(_cv.py_func)
+
+    cc.compile()
+
+
+if __name__ == "__main__":
+    output_dir = os.path.abspath(sys.argv[1]) if len(sys.argv) > 1 else os.path.dirname(os.path.abspath(__file__))
+    build(output_dir)
+    print(f"Built variance_kernels extension in {output_dir}")
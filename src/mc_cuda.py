@@ -0,0 +1,118 @@
+"""
+CUDA Monte Carlo Kernel
+
+GPU backend for the fused European call kernel in mc_kernels. Each CUDA
+thread draws normals from its own xoroshiro128+ state, evaluates the payoff
+for a batch of samples and keeps running sums in registers; the sums are
+then combined with a shared-memory tree reduction per block and one atomic
+add per block into the global result.
+
+Requires Numba with CUDA support and a CUDA-capable GPU.
+"""
+
+import math
+import numpy as np
+from typing import Tuple, Union
+
+try:
+    from numba import cuda, float64
+    from numba.cuda.random import (
+        create_xoroshiro128p_states,
+        xoroshiro128p_normal_float64
+    )
+    CUDA_AVAILABLE = cuda.is_available()
+except ImportError:
+    CUDA_AVAILABLE = False
+
+# Threads per CUDA block (power of two for the tree reduction)
+THREADS_PER_BLOCK = 256
+
+# Samples simulated by each thread
+SAMPLES_PER_THREAD = 32
+
+
+if CUDA_AVAILABLE:
+    @cuda.jit
+    def _mc_call_kernel(S0, K, drift, vol_sqrtT, n, rng_states, out):
+        block_sum = cuda.shared.array(THREADS_PER_BLOCK, float64)
+        block_sum_sq = cuda.shared.array(THREADS_PER_BLOCK, float64)
+
+        tid = cuda.threadIdx.x
+        gid = cuda.grid(1)
+        stride = cuda.gridsize(1)
+
+        # Grid-stride loop: thread gid handles samples gid, gid+stride, ...
+        s = 0.0
+        s2 = 0.0
+        i = gid
+        while i < n:
+            z = xoroshiro128p_normal_float64(rng_states, gid)
+            payoff = S0 * math.exp(drift + vol_sqrtT * z) - K
+            if payoff > 0.0:
+                s += payoff
+                s2 += payoff * payoff
+            i += stride
+
+        block_sum[tid] = s
+        block_sum_sq[tid] = s2
+        cuda.syncthreads()
+
+        # Tree reduction within the block
+        step = THREADS_PER_BLOCK // 2
+        while step > 0:
+            if tid < step:
+                block_sum[tid] += block_sum[tid + step]
+                block_sum_sq[tid] += block_sum_sq[tid + step]
+            cuda.syncthreads()
+            step //= 2
+
+        if tid == 0:
+            cuda.atomic.add(out, 0, block_sum[0])
+            cuda.atomic.add(out, 1, block_sum_sq[0])
+
+
+def mc_call_reduce_cuda(
+    S0: float,
+    K: float,
+    drift: float,
+    vol_sqrtT: float,
+    n: int,
+    seed: Union[int, np.random.SeedSequence]
+) -> Tuple[float, float]:
+    """
+    GPU version of mc_kernels.mc_call_reduce.
+
+    Args:
+        S0: Initial stock price
+        K: Strike price
+        drift: GBM drift term (r - 0.5*sigma^2)*T
+        vol_sqrtT: GBM diffusion scale sigma*sqrt(T)
+        n: Number of samples
+        seed: Integer seed or SeedSequence for reproducibility
+
+    Returns:
+        Tuple of (sum of payoffs, sum of squared payoffs)
+
+    Raises:
+        RuntimeError: If no CUDA device is available
+    """
+    if not CUDA_AVAILABLE:
+        raise RuntimeError("CUDA backend requires Numba CUDA support and a CUDA-capable GPU")
+
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    device_seed = int(seed.generate_state(1, dtype=np.uint64)[0])
+
+    n_threads = (n + SAMPLES_PER_THREAD - 1) // SAMPLES_PER_THREAD
+    n_blocks = (n_threads + THREADS_PER_BLOCK - 1) // THREADS_PER_BLOCK
+    n_threads = n_blocks * THREADS_PER_BLOCK
+
+    rng_states = create_xoroshiro128p_states(n_threads, seed=device_seed)
+    out = cuda.to_device(np.zeros(2, dtype=np.float64))
+
+    _mc_call_kernel[n_blocks, THREADS_PER_BLOCK](
+        float(S0), float(K), float(drift), float(vol_sqrtT), int(n), rng_states, out
+    )
+
+    payoff_sum, payoff_sum_sq = out.copy_to_host()
+    return float(payoff_sum), float(payoff_sum_sq)
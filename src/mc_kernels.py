@@ -0,0 +1,279 @@
+"""
+Compiled Monte Carlo Kernels
+
+This module contains the hot loops of the Monte Carlo pricer. The GBM
+simulation, payoff evaluation and moment accumulation are fused into a
+single pass so that no per-sample arrays are materialized.
+
+When Numba is available the kernel is JIT-compiled with parallel loops and
+fast-math (SVML-vectorized transcendentals when Intel's icc_rt is installed).
+Otherwise a vectorized NumPy implementation with the same interface is used.
+"""
+
+import math
+import numpy as np
+from functools import lru_cache
+from typing import Callable, Tuple, Union
+
+from option_pricing import precompute_gbm_constants
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Samples per parallel work item (~512 KB of float64, fits in L2)
+BLOCK_SIZE = 65536
+
+# Floating-point precisions selectable for the simulation pipeline
+DTYPES = {'f32': np.float32, 'f64': np.float64}
+
+# Samples per chunk in the NumPy fallback (~2 MB of float64); larger than
+# BLOCK_SIZE to amortize ufunc dispatch overhead
+NUMPY_BLOCK_SIZE = 262144
+
+# xoroshiro128+ shift/rotate constants (a=24, b=16, c=37) and the 2^-53
+# scale that maps the top 53 bits of an output to a uniform in [0, 1).
+# Kept as uint64 so Numba does not promote the bit operations to float
+_XO_A = np.uint64(24)
+_XO_A_INV = np.uint64(64 - 24)
+_XO_B = np.uint64(16)
+_XO_C = np.uint64(37)
+_XO_C_INV = np.uint64(64 - 37)
+_XO_SHIFT = np.uint64(11)
+_XO_SCALE = 1.0 / 9007199254740992.0
+
+
+def _mc_call_reduce_numpy(
+    S0: float,
+    K: float,
+    drift: float,
+    vol_sqrtT: float,
+    n: int,
+    seed_seq: np.random.SeedSequence,
+    dtype: type = np.float64
+) -> Tuple[float, float]:
+    """
+    NumPy fallback for mc_call_reduce (used when Numba is not installed).
+
+    Args:
+        S0: Initial stock price
+        K: Strike price
+        drift: GBM drift term (r - 0.5*sigma^2)*T
+        vol_sqrtT: GBM diffusion scale sigma*sqrt(T)
+        n: Number of samples
+        seed_seq: Seed sequence for the SFC64 generator
+        dtype: Floating-point type of the sample pipeline
+
+    Returns:
+        Tuple of (sum of payoffs, sum of squared payoffs)
+    """
+    rng = np.random.Generator(np.random.SFC64(seed_seq))
+    S0, K, drift, vol_sqrtT = (dtype(x) for x in (S0, K, drift, vol_sqrtT))
+
+    # Process cache-sized chunks through one reused buffer so the working
+    # set stays in L2 and peak memory is O(NUMPY_BLOCK_SIZE) instead of O(n)
+    buf = np.empty(min(NUMPY_BLOCK_SIZE, n), dtype=dtype)
+    payoff_sum = 0.0
+    payoff_sum_sq = 0.0
+    for offset in range(0, n, NUMPY_BLOCK_SIZE):
+        z = buf[:min(NUMPY_BLOCK_SIZE, n - offset)]
+        rng.standard_normal(dtype=dtype, out=z)
+
+        # Evaluate the payoff in place so NumPy's SIMD exp kernel runs on
+        # a contiguous buffer and no further temporaries are allocated
+        np.multiply(z, vol_sqrtT, out=z)
+        z += drift
+        np.exp(z, out=z)
+        z *= S0
+        np.subtract(z, K, out=z)
+        np.maximum(z, 0.0, out=z)
+
+        # Second moment via BLAS dot product (no squared temporary);
+        # per-chunk results are accumulated in float64
+        payoff_sum += float(z.sum(dtype=np.float64))
+        payoff_sum_sq += float(np.dot(z, z))
+
+    return float(payoff_sum), float(payoff_sum_sq)
+
+
+if NUMBA_AVAILABLE:
+    @njit(fastmath=True, cache=True, inline='always')
+    def _xoroshiro_next(s0, s1):
+        # One xoroshiro128+ step: returns (output, new s0, new s1)
+        result = s0 + s1
+        s1 ^= s0
+        s0 = ((s0 << _XO_A) | (s0 >> _XO_A_INV)) ^ s1 ^ (s1 << _XO_B)
+        s1 = (s1 << _XO_C) | (s1 >> _XO_C_INV)
+        return result, s0, s1
+
+    @njit(fastmath=True, cache=True, inline='always')
+    def _payoff(S0, K, drift, vol_sqrtT, z):
+        # Call payoff for one normal draw, 0 when out of the money
+        return max(S0 * math.exp(drift + vol_sqrtT * z) - K, 0.0)
+
+    @njit(fastmath=True, cache=True, inline='always')
+    def _block_moments(S0, K, drift, vol_sqrtT, n_block, s0, s1, dtype):
+        # Each block owns a 128-bit xoroshiro128+ state taken from the
+        # SeedSequence, so the result does not depend on how blocks are
+        # scheduled across threads and block streams cannot collide the
+        # way 32-bit reseeds of a shared generator can. Normals come in
+        # Box-Muller pairs; both halves are used.
+        s = 0.0
+        s2 = 0.0
+        for i in range(0, n_block, 2):
+            r1, s0, s1 = _xoroshiro_next(s0, s1)
+            r2, s0, s1 = _xoroshiro_next(s0, s1)
+            u1 = 1.0 - (r1 >> _XO_SHIFT) * _XO_SCALE   # (0, 1], log-safe
+            u2 = (r2 >> _XO_SHIFT) * _XO_SCALE
+            radius = math.sqrt(-2.0 * math.log(u1))
+            theta = 2.0 * math.pi * u2
+            
+            payoff = _payoff(S0, K, drift, vol_sqrtT, dtype(radius * math.cos(theta)))
+            s += payoff
+            s2 += payoff * payoff
+            if i + 1 < n_block:
+                payoff = _payoff(S0, K, drift, vol_sqrtT, dtype(radius * math.sin(theta)))
+                s += payoff
+                s2 += payoff * payoff
+        return s, s2
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _mc_call_reduce_numba(S0, K, drift, vol_sqrtT, n, block_states, dtype):
+        total = 0.0
+        total_sq = 0.0
+        for b in prange(block_states.shape[0]):
+            start = b * BLOCK_SIZE
+            n_block = min(start + BLOCK_SIZE, n) - start
+            s, s2 = _block_moments(S0, K, drift, vol_sqrtT, n_block,
+                                   block_states[b, 0], block_states[b, 1], dtype)
+            total += s
+            total_sq += s2
+        return total, total_sq
+
+
+def _as_seed_sequence(seed: Union[int, np.random.SeedSequence]) -> np.random.SeedSequence:
+    """Wrap an integer seed in a SeedSequence (SeedSequences pass through)."""
+    if isinstance(seed, np.random.SeedSequence):
+        return seed
+    return np.random.SeedSequence(seed)
+
+
+def _block_states(n: int, seed_seq: np.random.SeedSequence) -> np.ndarray:
+    """Derive one 128-bit xoroshiro128+ state per BLOCK_SIZE block from a SeedSequence."""
+    n_blocks = (n + BLOCK_SIZE - 1) // BLOCK_SIZE
+    states = seed_seq.generate_state(2 * n_blocks, dtype=np.uint64).reshape(n_blocks, 2)
+    # The all-zero state is a fixed point of xoroshiro128+ (p = 2^-128)
+    states[(states == 0).all(axis=1), 0] = 1
+    return states
+
+
+def mc_call_reduce(
+    S0: float,
+    K: float,
+    drift: float,
+    vol_sqrtT: float,
+    n: int,
+    seed: Union[int, np.random.SeedSequence],
+    dtype: type = np.float64
+) -> Tuple[float, float]:
+    """
+    Simulate n European call payoffs and return their first two raw moments.
+
+    Each sample draws Z ~ N(0,1) and evaluates:
+        payoff = max(S0 * exp(drift + vol_sqrtT*Z) - K, 0)
+    The sum and sum of squares are accumulated in registers, so memory use
+    is O(1) in n instead of four n-length temporaries.
+
+    Random streams are derived from a np.random.SeedSequence: the Numba
+    kernel gives each BLOCK_SIZE block its own 128-bit xoroshiro128+ state
+    from seed_seq.generate_state(), the NumPy fallback feeds it to an SFC64
+    generator. Pass a spawned child sequence
+    (e.g. SeedSequence(seed).spawn(size)[rank]) for independent streams.
+
+    With dtype=np.float32 the per-sample math runs in single precision
+    (half the bytes, twice the SIMD lanes); the sums stay in float64. The
+    MC standard error dwarfs float32 rounding for any practical n.
+
+    Args:
+        S0: Initial stock price
+        K: Strike price
+        drift: GBM drift term (r - 0.5*sigma^2)*T
+        vol_sqrtT: GBM diffusion scale sigma*sqrt(T)
+        n: Number of samples
+        seed: Integer seed or SeedSequence for reproducibility
+        dtype: np.float32 or np.float64 for the per-sample pipeline
+
+    Returns:
+        Tuple of (sum of payoffs, sum of squared payoffs)
+    """
+    assert dtype in (np.float32, np.float64), f"Unsupported dtype: {dtype}"
+
+    seed_seq = _as_seed_sequence(seed)
+
+    if NUMBA_AVAILABLE:
+        payoff_sum, payoff_sum_sq = _mc_call_reduce_numba(
+            dtype(S0), dtype(K), dtype(drift), dtype(vol_sqrtT), int(n),
+            _block_states(n, seed_seq), dtype
+        )
+        return float(payoff_sum), float(payoff_sum_sq)
+    return _mc_call_reduce_numpy(S0, K, drift, vol_sqrtT, n, seed_seq, dtype)
+
+
+@lru_cache(maxsize=32)
+def get_specialized_kernel(
+    S0: float,
+    K: float,
+    T: float,
+    r: float,
+    sigma: float,
+    dtype: type = np.float64
+) -> Callable[[int, Union[int, np.random.SeedSequence]], Tuple[float, float]]:
+    """
+    Build a call-payoff kernel with the option parameters baked in.
+
+    The returned kernel(n, seed) behaves like mc_call_reduce for fixed
+    (S0, K, T, r, sigma), but S0, K, drift and vol_sqrtT are compile-time
+    constants that LLVM folds into the exp/payoff chain. Kernels are
+    memoized per parameter tuple; the first call of each one pays the JIT
+    compile cost (closures are not cached on disk), later calls do not.
+    Useful for sweeps that reprice the same option over many seeds or N.
+
+    Args:
+        S0: Initial stock price
+        K: Strike price
+        T: Time to maturity
+        r: Risk-free rate
+        sigma: Volatility
+        dtype: np.float32 or np.float64 for the per-sample pipeline
+
+    Returns:
+        Function kernel(n, seed) -> (sum of payoffs, sum of squared payoffs)
+    """
+    drift, vol_sqrtT = precompute_gbm_constants(T, r, sigma)
+
+    if not NUMBA_AVAILABLE:
+        def kernel(n, seed):
+            return mc_call_reduce(S0, K, drift, vol_sqrtT, n, seed, dtype=dtype)
+        return kernel
+
+    c_S0, c_K, c_drift, c_vol_sqrtT = (dtype(x) for x in (S0, K, drift, vol_sqrtT))
+
+    @njit(parallel=True, fastmath=True)
+    def _specialized(n, block_states):
+        total = 0.0
+        total_sq = 0.0
+        for b in prange(block_states.shape[0]):
+            start = b * BLOCK_SIZE
+            n_block = min(start + BLOCK_SIZE, n) - start
+            s, s2 = _block_moments(c_S0, c_K, c_drift, c_vol_sqrtT, n_block,
+                                   block_states[b, 0], block_states[b, 1], dtype)
+            total += s
+            total_sq += s2
+        return total, total_sq
+
+    def kernel(n, seed):
+        payoff_sum, payoff_sum_sq = _specialized(int(n), _block_states(n, _as_seed_sequence(seed)))
+        return float(payoff_sum), float(payoff_sum_sq)
+    return kernel
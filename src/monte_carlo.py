@@ -10,8 +10,10 @@ Usage:
 """
 
 import argparse
+import math
 import time
 import numpy as np
+from functools import partial
 from typing import Tuple
 import sys
 
@@ -19,13 +21,15 @@ import sys
 from option_pricing import (
     validate_option_params,
     black_scholes_call,
-    simulate_gbm_terminal_price,
-    call_payoff
+    precompute_gbm_constants
 )
 from variance_reduction import (
     antithetic_variates_samples,
     antithetic_monte_carlo_prices
 )
+from utils import write_results_csv
+from mc_kernels import DTYPES, get_specialized_kernel, mc_call_reduce
+from mc_cuda import CUDA_AVAILABLE, mc_call_reduce_cuda
 
 
 def monte_carlo_european_call(
@@ -35,7 +39,10 @@ def monte_carlo_european_call(
     r: float,
     sigma: float,
     n_samples: int,
-    seed: int = 42
+    seed: int = 42,
+    device: str = "cpu",
+    dtype: str = "f64",
+    specialize: bool = False
 ) -> Tuple[float, float, float]:
     """
     Price a European call option using Monte Carlo simulation.
@@ -46,6 +53,9 @@ def monte_carlo_european_call(
         3. Average the payoffs and discount to present value
         4. Compute standard error for confidence intervals
     
+    Steps 1-2 and the payoff sums run in a single fused kernel
+    (see mc_kernels.mc_call_reduce), so no per-sample arrays are allocated.
+    
     Args:
         S0: Initial stock price
         K: Strike price
@@ -54,39 +64,56 @@ def monte_carlo_european_call(
         sigma: Volatility (annual)
         n_samples: Number of Monte Carlo samples
         seed: Random seed for reproducibility
+        device: "cpu" (Numba/NumPy kernel) or "cuda" (mc_cuda GPU kernel)
+        dtype: Simulation precision, "f64" or "f32" (CPU only; sums stay float64)
+        specialize: Use a kernel compiled for this exact (S0, K, T, r, sigma)
+                    (see mc_kernels.get_specialized_kernel); pays off when the
+                    same option is priced repeatedly in one process
         
     Returns:
         Tuple of (option_price, standard_error, elapsed_time)
+        (elapsed_time excludes JIT compilation)
     """
     # Validate inputs
     validate_option_params(S0, K, T, r, sigma)
     assert n_samples > 0, "Number of samples must be positive"
+    assert device in ("cpu", "cuda"), f"Unknown device: {device}"
+    assert dtype in DTYPES, f"Unknown dtype: {dtype}"
+    assert device == "cpu" or dtype == "f64", "CUDA kernel only supports f64"
     
-    # Set random seed for reproducibility
-    np.random.seed(seed)
+    # GBM parameters:
+    # S_T = S0 * exp((r - 0.5*sigma^2)*T + sigma*sqrt(T)*Z)
+    drift, vol_sqrtT = precompute_gbm_constants(T, r, sigma)
     
-    # Start timing
-    start_time = time.perf_counter()
+    # Select the payoff kernel: kernel(n, seed) -> (sum, sum of squares)
+    if device == "cuda":
+        kernel = partial(mc_call_reduce_cuda, S0, K, drift, vol_sqrtT)
+    elif specialize:
+        kernel = get_specialized_kernel(S0, K, T, r, sigma, dtype=DTYPES[dtype])
+    else:
+        kernel = partial(mc_call_reduce, S0, K, drift, vol_sqrtT, dtype=DTYPES[dtype])
     
-    # Generate random normal samples: Z ~ N(0,1)
-    Z = np.random.normal(0.0, 1.0, n_samples)
+    # Warm up on a single sample so JIT compilation is not timed
+    kernel(1, seed)
     
-    # Simulate terminal stock prices using GBM
-    # S_T = S0 * exp((r - 0.5*sigma^2)*T + sigma*sqrt(T)*Z)
-    drift = (r - 0.5 * sigma**2) * T
-    diffusion = sigma * np.sqrt(T) * Z
-    S_T = S0 * np.exp(drift + diffusion)
+    # Start timing
+    start_time = time.perf_counter()
     
-    # Calculate payoffs: max(S_T - K, 0)
-    payoffs = np.maximum(S_T - K, 0.0)
+    # Simulate paths and accumulate payoff moments in one fused pass
+    payoff_sum, payoff_sum_sq = kernel(n_samples, seed)
     
     # Compute option price: discounted expected payoff
-    discount_factor = np.exp(-r * T)
-    option_price = discount_factor * np.mean(payoffs)
+    discount_factor = math.exp(-r * T)
+    mean_payoff = payoff_sum / n_samples
+    option_price = discount_factor * mean_payoff
     
-    # Compute standard error: std(payoffs) / sqrt(n_samples)
-    std_payoffs = np.std(payoffs, ddof=1)  # Use sample std (N-1)
-    standard_error = discount_factor * std_payoffs / np.sqrt(n_samples)
+    # Compute standard error from sample variance (N-1)
+    if n_samples > 1:
+        variance_payoff = (payoff_sum_sq - n_samples * mean_payoff**2) / (n_samples - 1)
+    else:
+        variance_payoff = 0.0
+    std_payoffs = math.sqrt(max(variance_payoff, 0.0))
+    standard_error = discount_factor * std_payoffs / math.sqrt(n_samples)
     
     # End timing
     elapsed_time = time.perf_counter() - start_time
@@ -101,7 +128,8 @@ def monte_carlo_european_call_antithetic(
     r: float,
     sigma: float,
     n_samples: int,
-    seed: int = 42
+    seed: int = 42,
+    dtype: str = "f64"
 ) -> Tuple[float, float, float]:
     """
     Price a European call option using Monte Carlo with antithetic variates.
@@ -119,6 +147,7 @@ def monte_carlo_european_call_antithetic(
         sigma: Volatility (annual)
         n_samples: Total number of Monte Carlo samples (must be even)
         seed: Random seed for reproducibility
+        dtype: Simulation precision, "f64" or "f32" (sums stay float64)
         
     Returns:
         Tuple of (option_price, standard_error, elapsed_time)
@@ -127,32 +156,40 @@ def monte_carlo_european_call_antithetic(
     validate_option_params(S0, K, T, r, sigma)
     assert n_samples > 0, "Number of samples must be positive"
     assert n_samples % 2 == 0, "Number of samples must be even for antithetic variates"
+    assert dtype in DTYPES, f"Unknown dtype: {dtype}"
     
-    # Set random seed
-    np.random.seed(seed)
+    # Warm up on a single pair so JIT compilation is not timed
+    antithetic_monte_carlo_prices(S0, K, T, r, sigma, np.zeros(1, dtype=DTYPES[dtype]))
     
     # Start timing
     start_time = time.perf_counter()
     
     # Generate N/2 antithetic pairs (total N samples)
     n_pairs = n_samples // 2
-    Z_positive, Z_negative = antithetic_variates_samples(n_pairs, seed=seed)
+    Z = antithetic_variates_samples(n_pairs, seed=seed, dtype=DTYPES[dtype])
     
     # Compute payoffs for both paths
     payoffs_pos, payoffs_neg = antithetic_monte_carlo_prices(
-        S0, K, T, r, sigma, Z_positive, Z_negative
+        S0, K, T, r, sigma, Z
     )
     
-    # Combine payoffs
-    all_payoffs = np.concatenate([payoffs_pos, payoffs_neg])
+    # Accumulate payoff moments from both halves (no concatenated copy),
+    # in float64 even for float32 payoffs
+    payoff_sum = float(payoffs_pos.sum(dtype=np.float64) + payoffs_neg.sum(dtype=np.float64))
+    payoff_sum_sq = float(
+        np.einsum('i,i->', payoffs_pos, payoffs_pos, dtype=np.float64)
+        + np.einsum('i,i->', payoffs_neg, payoffs_neg, dtype=np.float64)
+    )
     
     # Compute option price: discounted expected payoff
-    discount_factor = np.exp(-r * T)
-    option_price = discount_factor * np.mean(all_payoffs)
+    discount_factor = math.exp(-r * T)
+    mean_payoff = payoff_sum / n_samples
+    option_price = discount_factor * mean_payoff
     
-    # Compute standard error
-    std_payoffs = np.std(all_payoffs, ddof=1)
-    standard_error = discount_factor * std_payoffs / np.sqrt(n_samples)
+    # Compute standard error from sample variance (N-1)
+    variance_payoff = (payoff_sum_sq - payoff_sum * mean_payoff) / (n_samples - 1)
+    std_payoffs = math.sqrt(max(variance_payoff, 0.0))
+    standard_error = discount_factor * std_payoffs / math.sqrt(n_samples)
     
     # End timing
     elapsed_time = time.perf_counter() - start_time
@@ -186,6 +223,10 @@ def main():
                         help="Random seed for reproducibility")
     parser.add_argument("--antithetic", action="store_true",
                         help="Use antithetic variates for variance reduction")
+    parser.add_argument("--device", type=str, default="cpu", choices=["cpu", "cuda"],
+                        help="Compute device for the Monte Carlo kernel")
+    parser.add_argument("--dtype", type=str, default="f64", choices=list(DTYPES),
+                        help="Floating-point precision of the simulation")
     
     # Output options
     parser.add_argument("--output", type=str, default=None,
@@ -195,6 +236,17 @@ def main():
     
     args = parser.parse_args()
     
+    if args.device == "cuda":
+        if not CUDA_AVAILABLE:
+            print("Error: --device cuda requires Numba CUDA support and a CUDA-capable GPU")
+            return 1
+        if args.antithetic:
+            print("Error: --antithetic is not supported with --device cuda")
+            return 1
+        if args.dtype != "f64":
+            print("Error: --device cuda only supports --dtype f64")
+            return 1
+    
     # Print configuration
     print("=" * 70)
     print("Monte Carlo European Call Option Pricing")
@@ -211,6 +263,8 @@ def main():
     print(f"  N (samples):          {args.n_samples:,}")
     print(f"  Random seed:          {args.seed}")
     print(f"  Variance reduction:   {'Antithetic variates' if args.antithetic else 'None'}")
+    print(f"  Device:               {args.device}")
+    print(f"  Precision:            {args.dtype}")
     print("=" * 70)
     
     # Run Monte Carlo simulation
@@ -228,7 +282,8 @@ def main():
             r=args.r,
             sigma=args.sigma,
             n_samples=args.n_samples,
-            seed=args.seed
+            seed=args.seed,
+            dtype=args.dtype
         )
     else:
         mc_price, mc_stderr, elapsed = monte_carlo_european_call(
@@ -238,7 +293,9 @@ def main():
             r=args.r,
             sigma=args.sigma,
             n_samples=args.n_samples,
-            seed=args.seed
+            seed=args.seed,
+            device=args.device,
+            dtype=args.dtype
         )
     
     # Calculate throughput
@@ -278,13 +335,11 @@ def main():
     
     # Save to CSV if requested
     if args.output:
-        import pandas as pd
-        
         # Calculate analytical price for reference
         bs_price = black_scholes_call(args.S0, args.K, args.T, args.r, args.sigma)
         
         method_name = 'serial_mc_antithetic' if args.antithetic else 'serial_mc'
-        results_df = pd.DataFrame([{
+        results_data = [{
             'method': method_name,
             'n_samples': args.n_samples,
             'S0': args.S0,
@@ -300,10 +355,12 @@ def main():
             'elapsed_sec': elapsed,
             'throughput_samples_per_sec': throughput,
             'antithetic': args.antithetic,
+            'device': args.device,
+            'dtype': args.dtype,
             'seed': args.seed
-        }])
+        }]
         
-        results_df.to_csv(args.output, index=False)
+        write_results_csv(args.output, results_data)
         print(f"Results saved to: {args.output}")
     
     return 0
@@ -13,6 +13,7 @@ Usage:
 """
 
 import argparse
+import math
 import time
 import numpy as np
 from typing import Tuple, Optional
@@ -28,7 +29,8 @@ except ImportError:
 # Import option pricing functions
 from option_pricing import (
     validate_option_params,
-    black_scholes_call
+    black_scholes_call,
+    precompute_gbm_constants
 )
 from utils import (
     log_message,
@@ -43,6 +45,7 @@ from variance_reduction import (
     antithetic_variates_samples,
     antithetic_monte_carlo_prices
 )
+from mc_kernels import DTYPES, mc_call_reduce
 
 
 def monte_carlo_european_call_mpi(
@@ -53,15 +56,17 @@ def monte_carlo_european_call_mpi(
     sigma: float,
     n_samples: int,
     seed: int = 42,
-    comm: Optional[MPI.Comm] = None
-) -> Tuple[float, float, float, int]:
+    comm: Optional[MPI.Comm] = None,
+    dtype: str = "f64"
+) -> Tuple[Optional[float], Optional[float], float, int, Optional[np.ndarray]]:
     """
     Price a European call option using parallel Monte Carlo simulation with MPI.
     
     Algorithm (Embarrassingly Parallel):
         1. Each MPI rank generates n_samples // size local samples
-        2. Each rank computes local payoff statistics
-        3. Root rank aggregates results using MPI.reduce()
+        2. Each rank computes local payoff statistics (fused kernel, no
+           per-sample arrays; see mc_kernels.mc_call_reduce)
+        3. Root rank aggregates results using MPI.Ireduce()
         4. Root rank computes final price and standard error
     
     Args:
@@ -71,11 +76,15 @@ def monte_carlo_european_call_mpi(
         r: Risk-free rate (annual)
         sigma: Volatility (annual)
         n_samples: Total number of Monte Carlo samples (across all ranks)
-        seed: Base random seed for reproducibility
+        seed: Base random seed; each rank uses SeedSequence(seed).spawn(size)[rank]
+              (results differ from the older seed + rank scheme)
         comm: MPI communicator (defaults to MPI.COMM_WORLD)
+        dtype: Simulation precision, "f64" or "f32" (sums stay float64)
         
     Returns:
-        Tuple of (option_price, standard_error, elapsed_time, rank)
+        Tuple of (option_price, standard_error, elapsed_time, rank, rank_times).
+        On root, elapsed_time is the slowest rank's time and rank_times holds
+        every rank's elapsed time; other ranks get their own time and None.
     """
     # Get MPI communicator
     if comm is None:
@@ -88,6 +97,15 @@ def monte_carlo_european_call_mpi(
     validate_option_params(S0, K, T, r, sigma)
     assert n_samples > 0, "Number of samples must be positive"
     assert n_samples >= size, f"n_samples ({n_samples}) must be >= num_ranks ({size})"
+    assert dtype in DTYPES, f"Unknown dtype: {dtype}"
+    
+    # GBM parameters:
+    # S_T = S0 * exp((r - 0.5*sigma^2)*T + sigma*sqrt(T)*Z)
+    drift, vol_sqrtT = precompute_gbm_constants(T, r, sigma)
+    
+    # Warm up the kernel on one sample so per-rank JIT compilation or cache
+    # loading does not show up as a straggler in the timings
+    mc_call_reduce(S0, K, drift, vol_sqrtT, 1, seed, dtype=DTYPES[dtype])
     
     # Barrier to synchronize all ranks before starting
     comm.Barrier()
@@ -101,45 +119,56 @@ def monte_carlo_european_call_mpi(
     if rank < remainder:
         local_n += 1
     
-    # Set rank-dependent random seed for independent samples
-    # Each rank gets a different seed to ensure statistical independence
-    local_seed = seed + rank
-    np.random.seed(local_seed)
+    # Spawn an independent random stream for each rank from one root
+    # SeedSequence (avoids overlapping streams from seed + rank arithmetic)
+    local_seed_seq = np.random.SeedSequence(seed).spawn(size)[rank]
     
     if rank == 0:
-        log_message(f"Starting MPI Monte Carlo with {size} ranks", rank=0)
-        log_message(f"Total samples: {format_number(n_samples)}", rank=0)
-        log_message(f"Samples per rank: ~{format_number(n_samples // size)}", rank=0)
+        # Buffered inside the timed region; flushed by the completion message
+        log_message(f"Starting MPI Monte Carlo with {size} ranks", rank=0, flush=False)
+        log_message(f"Total samples: {format_number(n_samples)}", rank=0, flush=False)
+        log_message(f"Samples per rank: ~{format_number(n_samples // size)}", rank=0, flush=False)
     
-    # Generate local random samples: Z ~ N(0,1)
-    Z = np.random.normal(0.0, 1.0, local_n)
-    
-    # Simulate terminal stock prices using GBM
-    # S_T = S0 * exp((r - 0.5*sigma^2)*T + sigma*sqrt(T)*Z)
-    drift = (r - 0.5 * sigma**2) * T
-    diffusion = sigma * np.sqrt(T) * Z
-    S_T = S0 * np.exp(drift + diffusion)
-    
-    # Calculate local payoffs: max(S_T - K, 0)
-    local_payoffs = np.maximum(S_T - K, 0.0)
-    
-    # Compute local statistics
-    local_sum = np.sum(local_payoffs)
-    local_sum_sq = np.sum(local_payoffs**2)
+    # Simulate local paths and accumulate payoff moments in one fused pass
+    local_sum, local_sum_sq = mc_call_reduce(
+        S0, K, drift, vol_sqrtT, local_n, local_seed_seq, dtype=DTYPES[dtype]
+    )
     local_count = local_n
     
-    # Aggregate results across all ranks using MPI.reduce()
-    # Sum up payoffs and squared payoffs from all ranks
-    global_sum = comm.reduce(local_sum, op=MPI.SUM, root=0)
-    global_sum_sq = comm.reduce(local_sum_sq, op=MPI.SUM, root=0)
-    global_count = comm.reduce(local_count, op=MPI.SUM, root=0)
+    # Aggregate results across all ranks with a single non-blocking MPI.Ireduce()
+    # Sum, squared sum and sample count are packed into one float64 buffer
+    sendbuf = np.array([local_sum, local_sum_sq, float(local_count)], dtype=np.float64)
+    recvbuf = np.zeros(3, dtype=np.float64) if rank == 0 else None
+    reduce_request = comm.Ireduce(
+        [sendbuf, MPI.DOUBLE],
+        [recvbuf, MPI.DOUBLE] if rank == 0 else None,
+        op=MPI.SUM,
+        root=0
+    )
     
-    # Synchronize all ranks
-    comm.Barrier()
+    # Overlap root's logging with the reduction tree
+    if rank == 0:
+        log_message("Local compute done, reducing across ranks", rank=0, flush=False)
+    
+    # Wait completes on root only once every rank has contributed,
+    # so no extra Barrier is needed before stopping the clock
+    reduce_request.Wait()
     elapsed_time = time.perf_counter() - start_time
     
+    # Gather per-rank times so root can report the slowest rank (the true
+    # wall-clock time) and spot load imbalance
+    local_elapsed = np.array([elapsed_time], dtype=np.float64)
+    rank_times = np.zeros(size, dtype=np.float64) if rank == 0 else None
+    comm.Gather(
+        [local_elapsed, MPI.DOUBLE],
+        [rank_times, MPI.DOUBLE] if rank == 0 else None,
+        root=0
+    )
+    
     # Root rank computes final results
     if rank == 0:
+        global_sum, global_sum_sq, global_count = recvbuf
+        
         # Compute mean payoff
         mean_payoff = global_sum / global_count
         
@@ -147,31 +176,39 @@ def monte_carlo_european_call_mpi(
         # Var(X) = E[X^2] - E[X]^2
         mean_payoff_sq = global_sum_sq / global_count
         variance_payoff = mean_payoff_sq - mean_payoff**2
-        std_payoff = np.sqrt(variance_payoff)
+        std_payoff = math.sqrt(max(variance_payoff, 0.0))
         
         # Discount to present value
-        discount_factor = np.exp(-r * T)
+        discount_factor = math.exp(-r * T)
         option_price = discount_factor * mean_payoff
         
         # Standard error: std(payoffs) / sqrt(N)
-        standard_error = discount_factor * std_payoff / np.sqrt(global_count)
+        standard_error = discount_factor * std_payoff / math.sqrt(global_count)
         
+        elapsed_time = float(rank_times.max())
         log_message(f"MPI Monte Carlo completed in {format_time(elapsed_time)}", rank=0)
         
-        return option_price, standard_error, elapsed_time, rank
+        return option_price, standard_error, elapsed_time, rank, rank_times
     else:
         # Non-root ranks return None values (won't be used)
-        return None, None, elapsed_time, rank
+        return None, None, elapsed_time, rank, None
 
 
-def main():
-    """Main entry point for MPI Monte Carlo simulation."""
-    # Initialize MPI
-    comm = MPI.COMM_WORLD
+def _run(comm: MPI.Comm) -> Tuple[int, Optional[float], Optional[float]]:
+    """
+    Parse arguments, run the simulation and report on the root rank.
+    
+    Args:
+        comm: MPI communicator the simulation runs on
+        
+    Returns:
+        Tuple of (exit_code, option_price, standard_error); the price and
+        error are None on non-root ranks and when argument parsing exits.
+    """
     rank = comm.Get_rank()
     size = comm.Get_size()
     
-    # Parse command-line arguments (all ranks do this)
+    # Build command-line parser (only root parses, see below)
     parser = argparse.ArgumentParser(
         description="MPI parallel Monte Carlo pricing for European call options",
         formatter_class=argparse.ArgumentDefaultsHelpFormatter
@@ -194,6 +231,8 @@ def main():
                         help="Total number of Monte Carlo samples")
     parser.add_argument("--seed", type=int, default=42,
                         help="Base random seed for reproducibility")
+    parser.add_argument("--dtype", type=str, default="f64", choices=list(DTYPES),
+                        help="Floating-point precision of the simulation")
     
     # Output options
     parser.add_argument("--output", type=str, default=None,
@@ -201,7 +240,20 @@ def main():
     parser.add_argument("--validate", action="store_true",
                         help="Compare MC result with Black-Scholes analytical price")
     
-    args = parser.parse_args()
+    # Root parses the command line and broadcasts the result (including the
+    # seed every rank derives its SeedSequence from), so all ranks run with
+    # identical arguments. If parsing exits (--help or bad arguments), root
+    # broadcasts None so the other ranks exit too instead of hanging.
+    args = None
+    exit_code = 0
+    if rank == 0:
+        try:
+            args = parser.parse_args()
+        except SystemExit as exc:
+            exit_code = exc.code
+    args = comm.bcast(args, root=0)
+    if args is None:
+        return exit_code, None, None
     
     # Root rank prints configuration
     if rank == 0:
@@ -218,11 +270,12 @@ def main():
         print(f"\nMonte Carlo Settings:")
         print(f"  Total samples:         {format_number(args.n_samples)}")
         print(f"  Base random seed:      {args.seed}")
+        print(f"  Precision:             {args.dtype}")
         print(f"  Git commit:            {get_git_commit_hash()[:8]}")
         print_separator()
     
     # Run MPI Monte Carlo simulation
-    mc_price, mc_stderr, elapsed, _ = monte_carlo_european_call_mpi(
+    mc_price, mc_stderr, elapsed, _, rank_times = monte_carlo_european_call_mpi(
         S0=args.S0,
         K=args.K,
         T=args.T,
@@ -230,7 +283,8 @@ def main():
         sigma=args.sigma,
         n_samples=args.n_samples,
         seed=args.seed,
-        comm=comm
+        comm=comm,
+        dtype=args.dtype
     )
     
     # Only root rank prints results and saves output
@@ -246,6 +300,8 @@ def main():
               f"${mc_price + 1.96*mc_stderr:.6f}]")
         print(f"\nPerformance:")
         print(f"  Wall-clock time:      {format_time(elapsed)}")
+        print(f"  Rank time (p50/max):  {format_time(float(np.median(rank_times)))} / "
+              f"{format_time(elapsed)}")
         print(f"  Throughput:           {throughput:,.0f} samples/sec")
         print(f"  Throughput per rank:  {throughput/size:,.0f} samples/sec/rank")
         
@@ -292,16 +348,46 @@ def main():
                 'abs_error': abs(mc_price - bs_price),
                 'rel_error_pct': abs(mc_price - bs_price) / bs_price * 100,
                 'elapsed_sec': elapsed,
+                'elapsed_p50': float(np.median(rank_times)),
+                'elapsed_max': elapsed,
                 'throughput_samples_per_sec': throughput,
                 'throughput_per_rank': throughput / size,
                 'seed': args.seed,
+                'dtype': args.dtype,
                 'git_commit': get_git_commit_hash()[:8]
             }]
             
             write_results_csv(args.output, results_data)
             log_message(f"Results saved to: {args.output}", rank=0)
     
-    return 0
+    return 0, mc_price, mc_stderr
+
+
+def main():
+    """Main entry point for MPI Monte Carlo simulation."""
+    # Initialize MPI
+    comm = MPI.COMM_WORLD
+    parent = MPI.Comm.Get_parent()
+    if parent == MPI.COMM_NULL:
+        return _run(comm)[0]
+    
+    # Started via MPI.Comm.Spawn (e.g. by the test suite): hand the result
+    # straight to the parent instead of making it parse stdout. Root always
+    # answers, even when parsing exits early or the run raises, so the
+    # parent never waits on a result that is not coming; NaNs mark a
+    # failed run. Disconnect is collective over the intercommunicator, so
+    # all ranks call it.
+    result = np.full(2, np.nan)
+    exit_code = 1
+    try:
+        exit_code, mc_price, mc_stderr = _run(comm)
+        if mc_price is not None:
+            result[:] = (mc_price, mc_stderr)
+    finally:
+        if comm.Get_rank() == 0:
+            parent.Send(result, dest=0)
+        parent.Disconnect()
+    return exit_code
 
 
 if __name__ == "__main__":
@@ -9,9 +9,11 @@ References:
     Journal of Political Economy, 81(3), 637-654.
 """
 
+import math
 import numpy as np
-from scipy.stats import norm
-from typing import Tuple
+from functools import lru_cache
+from scipy.special import ndtr
+from typing import Tuple, Union
 
 
 def validate_option_params(S0: float, K: float, T: float, r: float, sigma: float) -> None:
@@ -44,7 +46,8 @@ def black_scholes_call(S0: float, K: float, T: float, r: float, sigma: float) ->
     where:
         d1 = [ln(S0/K) + (r + sigma^2/2)*T] / (sigma*sqrt(T))
         d2 = d1 - sigma*sqrt(T)
-        N(x) = cumulative standard normal distribution
+        N(x) = cumulative standard normal distribution (scipy.special.ndtr,
+               the kernel behind norm.cdf without its argument handling)
     
     Args:
         S0: Initial stock price
@@ -56,6 +59,9 @@ def black_scholes_call(S0: float, K: float, T: float, r: float, sigma: float) ->
     Returns:
         Call option price
         
+    Note:
+        Scalar arguments only (uses math.log/exp/sqrt).
+        
     Example:
         >>> price = black_scholes_call(100, 100, 1.0, 0.05, 0.2)
         >>> print(f"Call price: ${price:.2f}")
@@ -63,11 +69,12 @@ def black_scholes_call(S0: float, K: float, T: float, r: float, sigma: float) ->
     validate_option_params(S0, K, T, r, sigma)
     
     # Calculate d1 and d2
-    d1 = (np.log(S0 / K) + (r + 0.5 * sigma**2) * T) / (sigma * np.sqrt(T))
-    d2 = d1 - sigma * np.sqrt(T)
+    vol_sqrtT = sigma * math.sqrt(T)
+    d1 = (math.log(S0 / K) + (r + 0.5 * sigma * sigma) * T) / vol_sqrtT
+    d2 = d1 - vol_sqrtT
     
     # Calculate call option price using Black-Scholes formula
-    call_price = S0 * norm.cdf(d1) - K * np.exp(-r * T) * norm.cdf(d2)
+    call_price = S0 * ndtr(d1) - K * math.exp(-r * T) * ndtr(d2)
     
     return call_price
 
@@ -88,15 +95,19 @@ def black_scholes_put(S0: float, K: float, T: float, r: float, sigma: float) ->
         
     Returns:
         Put option price
+        
+    Note:
+        Scalar arguments only (uses math.log/exp/sqrt).
     """
     validate_option_params(S0, K, T, r, sigma)
     
     # Calculate d1 and d2
-    d1 = (np.log(S0 / K) + (r + 0.5 * sigma**2) * T) / (sigma * np.sqrt(T))
-    d2 = d1 - sigma * np.sqrt(T)
+    vol_sqrtT = sigma * math.sqrt(T)
+    d1 = (math.log(S0 / K) + (r + 0.5 * sigma * sigma) * T) / vol_sqrtT
+    d2 = d1 - vol_sqrtT
     
     # Calculate put option price using Black-Scholes formula
-    put_price = K * np.exp(-r * T) * norm.cdf(-d2) - S0 * norm.cdf(-d1)
+    put_price = K * math.exp(-r * T) * ndtr(-d2) - S0 * ndtr(-d1)
     
     return put_price
 
@@ -133,6 +144,50 @@ def put_payoff(S_T: float, K: float) -> float:
     return max(K - S_T, 0.0)
 
 
+@lru_cache(maxsize=128)
+def precompute_gbm_constants(T: float, r: float, sigma: float) -> Tuple[float, float]:
+    """
+    Compute the per-path invariant GBM constants (memoized).
+    
+    Args:
+        T: Time to maturity
+        r: Risk-free rate
+        sigma: Volatility
+        
+    Returns:
+        Tuple of (drift, vol_sqrtT) where
+            drift = (r - 0.5*sigma^2)*T
+            vol_sqrtT = sigma*sqrt(T)
+    """
+    drift = (r - 0.5 * sigma * sigma) * T
+    vol_sqrtT = sigma * math.sqrt(T)
+    return drift, vol_sqrtT
+
+
+def simulate_gbm_terminal_price_array(
+    S0: float,
+    Z: Union[float, np.ndarray],
+    drift: float,
+    vol_sqrtT: float
+) -> Union[float, np.ndarray]:
+    """
+    Simulate terminal stock prices from precomputed GBM constants.
+    
+    Use this in loops together with precompute_gbm_constants() so the
+    constants are not recomputed for every sample.
+    
+    Args:
+        S0: Initial stock price
+        Z: Standard normal sample(s)
+        drift: (r - 0.5*sigma^2)*T
+        vol_sqrtT: sigma*sqrt(T)
+        
+    Returns:
+        Simulated terminal stock price(s), same shape as Z
+    """
+    return S0 * np.exp(drift + vol_sqrtT * Z)
+
+
 def simulate_gbm_terminal_price(S0: float, T: float, r: float, sigma: float, Z: float) -> float:
     """
     Simulate terminal stock price under Geometric Brownian Motion (GBM).
@@ -154,10 +209,8 @@ def simulate_gbm_terminal_price(S0: float, T: float, r: float, sigma: float, Z:
     Returns:
         Simulated terminal stock price
     """
-    drift = (r - 0.5 * sigma**2) * T
-    diffusion = sigma * np.sqrt(T) * Z
-    S_T = S0 * np.exp(drift + diffusion)
-    return S_T
+    drift, vol_sqrtT = precompute_gbm_constants(T, r, sigma)
+    return simulate_gbm_terminal_price_array(S0, Z, drift, vol_sqrtT)
 
 
 if __name__ == "__main__":
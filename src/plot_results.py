@@ -12,18 +12,31 @@ Usage:
     python src/plot_results.py --strong results/strong_*.csv --weak results/weak_*.csv
     python src/plot_results.py --convergence results/convergence_*.csv
     python src/plot_results.py --all results/
+    MCHPC_FAST_SVG=1 python src/plot_results.py --all results/   # bare SVG scaling plots
 """
 
 import argparse
 import glob
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # File output only; skip GUI backend probing
 import matplotlib.pyplot as plt
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Tuple
 import sys
 import os
 
+from utils import write_results_csv
+
+try:
+    import pyarrow.csv as pacsv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
 # Set publication-quality defaults
 plt.rcParams['figure.figsize'] = (10, 6)
 plt.rcParams['font.size'] = 12
@@ -36,42 +49,209 @@ plt.rcParams['figure.dpi'] = 100
 plt.rcParams['savefig.dpi'] = 300
 plt.rcParams['savefig.bbox'] = 'tight'
 
+# MPI tasks per node used to convert n_ranks into node counts
+TASKS_PER_NODE = 16
+
+# Bytes per block for the threaded Arrow CSV reader
+CSV_BLOCK_SIZE = 1 << 20
+
+# Upper bound on threads used to read several scaling CSVs concurrently
+MAX_READ_WORKERS = 8
+
+
+@lru_cache(maxsize=1)
+def _single_axes():
+    """Return the shared (Figure, Axes) pair reused by the single-panel plots."""
+    return plt.subplots(figsize=(10, 6))
+
+
+@lru_cache(maxsize=1)
+def _pair_axes():
+    """Return the shared (Figure, (Axes, Axes)) reused by the comparison plot."""
+    return plt.subplots(1, 2, figsize=(14, 6))
+
+
+def read_results_csv(path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Read a results CSV into a DataFrame.
+    
+    Uses pyarrow's multithreaded columnar reader when installed and falls
+    back to pandas otherwise.
+    
+    Args:
+        path: CSV file path
+        columns: Optional subset of columns to load (others are skipped)
+        
+    Returns:
+        DataFrame with the file contents
+    """
+    if not PYARROW_AVAILABLE:
+        return pd.read_csv(path, usecols=columns)
+    
+    table = pacsv.read_csv(
+        path,
+        read_options=pacsv.ReadOptions(use_threads=True, block_size=CSV_BLOCK_SIZE),
+        convert_options=pacsv.ConvertOptions(include_columns=columns)
+    )
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def _rank_partials(path: str) -> pd.DataFrame:
+    """Reduce one scaling CSV to elapsed_sec sum and count per n_ranks."""
+    df = read_results_csv(path, columns=['n_ranks', 'elapsed_sec'])
+    return df.groupby('n_ranks')['elapsed_sec'].agg(['sum', 'count'])
+
+
+@lru_cache(maxsize=32)
+def _load_and_group(files_tuple: Tuple[Tuple[str, float], ...], tasks_per_node: int) -> pd.DataFrame:
+    """
+    Read scaling CSVs and return mean elapsed time per node count.
+    
+    Cached on (path, mtime) pairs, so repeated plots over the same inputs
+    skip the CSV parse; editing a file invalidates its entry. Each file is
+    reduced to per-n_ranks (sum, count) partials, so memory is bounded by
+    the number of rank counts rather than the total row count, and nodes
+    are derived only on the final small table. Several files are parsed
+    concurrently in a thread pool (the CSV readers release the GIL).
+    
+    Args:
+        files_tuple: Sorted tuple of (path, modification time) pairs
+        tasks_per_node: MPI tasks per node used to derive the node count
+        
+    Returns:
+        DataFrame with 'nodes' and 'elapsed_sec' columns, sorted by nodes
+    """
+    files = [file for file, _ in files_tuple]
+    if len(files) == 1:
+        partials = [_rank_partials(files[0])]
+    else:
+        with ThreadPoolExecutor(max_workers=min(MAX_READ_WORKERS, len(files))) as ex:
+            partials = list(ex.map(_rank_partials, files))
+    
+    accum = partials[0]
+    for partial in partials[1:]:
+        accum = accum.add(partial, fill_value=0)
+    
+    grouped = pd.DataFrame({
+        'nodes': accum.index.to_numpy() / tasks_per_node,
+        'elapsed_sec': (accum['sum'] / accum['count']).to_numpy()
+    })
+    return grouped.sort_values('nodes', ignore_index=True)
+
+
+def load_scaling_data(csv_files: List[str], tasks_per_node: int = TASKS_PER_NODE) -> pd.DataFrame:
+    """
+    Load and group scaling CSVs through the _load_and_group cache.
+    
+    Args:
+        csv_files: List of CSV files with scaling data
+        tasks_per_node: MPI tasks per node used to derive the node count
+        
+    Returns:
+        Copy of the cached grouped DataFrame (safe for callers to modify)
+    """
+    files_tuple = tuple(sorted((f, os.path.getmtime(f)) for f in csv_files))
+    return _load_and_group(files_tuple, tasks_per_node).copy()
+
+
+def _render_svg_scaling(
+    grouped: pd.DataFrame,
+    path: str,
+    y_col: str,
+    ideal,
+    title: str,
+    ylabel: str,
+    color: str
+) -> None:
+    """
+    Write a scaling plot as a bare SVG without going through matplotlib.
+    
+    Nodes are mapped onto a log2 x axis and y_col onto a linear y axis;
+    the measured series and the ideal curve are emitted as polylines with
+    one label per point. Enabled with MCHPC_FAST_SVG=1 for quick previews
+    (e.g. CI), where building a matplotlib figure dominates the run time.
+    
+    Args:
+        grouped: Grouped scaling data with 'nodes', y_col and 'efficiency'
+        path: Output SVG path
+        y_col: Column plotted on the y axis
+        ideal: Ideal y value(s): scalar or array aligned with grouped
+        title: Plot title
+        ylabel: Y axis label
+        color: Stroke color of the measured series
+    """
+    width, height, margin = 640, 400, 60
+    x = np.log2(grouped['nodes'].to_numpy())
+    y = grouped[y_col].to_numpy()
+    ideal = np.broadcast_to(np.asarray(ideal, dtype=float), y.shape)
+    
+    x_span = max(x.max() - x.min(), 1.0)
+    y_max = max(y.max(), ideal.max()) * 1.1
+    px = margin + (x - x.min()) / x_span * (width - 2 * margin)
+    py_meas = height - margin - y / y_max * (height - 2 * margin)
+    py_ideal = height - margin - ideal / y_max * (height - 2 * margin)
+    
+    def points(xs, ys):
+        return " ".join(f"{a:.1f},{b:.1f}" for a, b in zip(xs, ys))
+    
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'font-family="sans-serif" font-size="12">',
+        f'<rect x="{margin}" y="{margin}" width="{width - 2 * margin}" '
+        f'height="{height - 2 * margin}" fill="none" stroke="black"/>',
+        f'<text x="{width / 2}" y="{margin / 2}" text-anchor="middle" font-size="16">{title}</text>',
+        f'<text x="{width / 2}" y="{height - 15}" text-anchor="middle">Number of Nodes</text>',
+        f'<text x="15" y="{height / 2}" text-anchor="middle" '
+        f'transform="rotate(-90 15 {height / 2})">{ylabel}</text>',
+        f'<polyline points="{points(px, py_ideal)}" fill="none" stroke="#A23B72" '
+        f'stroke-width="2" stroke-dasharray="6,4"/>',
+        f'<polyline points="{points(px, py_meas)}" fill="none" stroke="{color}" stroke-width="2"/>',
+    ]
+    for n, cx, cy, e in zip(grouped['nodes'].to_numpy(), px, py_meas, grouped['efficiency'].to_numpy()):
+        parts.append(f'<circle cx="{cx:.1f}" cy="{cy:.1f}" r="5" fill="{color}"/>')
+        parts.append(f'<text x="{cx:.1f}" y="{cy - 10:.1f}" text-anchor="middle">{e:.1f}%</text>')
+        parts.append(f'<text x="{cx:.1f}" y="{height - margin + 18}" text-anchor="middle">{n:g}</text>')
+    parts.append('</svg>')
+    
+    with open(path, 'w') as f:
+        f.write("\n".join(parts))
+
 
-def plot_strong_scaling(csv_files: List[str], output_path: str = "results/strong_scaling.png") -> None:
+def plot_strong_scaling(
+    csv_files: List[str],
+    output_path: str = "results/strong_scaling.png",
+    tasks_per_node: int = TASKS_PER_NODE
+) -> None:
     """
     Generate strong scaling plot: speedup vs number of nodes.
     
     Args:
         csv_files: List of CSV files with strong scaling data
         output_path: Output path for the plot
+        tasks_per_node: MPI tasks per node used to derive the node count
     """
-    # Read and combine all CSV files
-    dfs = []
-    for file in csv_files:
-        df = pd.read_csv(file)
-        # Extract node count from filename or data
-        if 'n_ranks' in df.columns:
-            # Calculate nodes assuming 16 tasks per node (adjust if needed)
-            df['nodes'] = df['n_ranks'] / 16
-        dfs.append(df)
-    
-    if not dfs:
+    if not csv_files:
         print("No strong scaling data found")
         return
     
-    data = pd.concat(dfs, ignore_index=True)
-    
-    # Group by node count and compute speedup
-    grouped = data.groupby('nodes')['elapsed_sec'].mean().reset_index()
-    grouped = grouped.sort_values('nodes')
+    # Mean time per node count (cached across plots)
+    grouped = load_scaling_data(csv_files, tasks_per_node)
     
     # Compute speedup relative to 1 node
     baseline_time = grouped[grouped['nodes'] == grouped['nodes'].min()]['elapsed_sec'].values[0]
     grouped['speedup'] = baseline_time / grouped['elapsed_sec']
     grouped['efficiency'] = grouped['speedup'] / grouped['nodes'] * 100
     
+    if os.environ.get('MCHPC_FAST_SVG') == '1':
+        svg_path = str(Path(output_path).with_suffix('.svg'))
+        _render_svg_scaling(grouped, svg_path, 'speedup', grouped['nodes'].to_numpy(),
+                            'Strong Scaling: Speedup vs Number of Nodes', 'Speedup', '#2E86AB')
+        print(f"✅ Strong scaling plot saved to: {svg_path}")
+        return
+    
     # Create plot
-    fig, ax = plt.subplots(figsize=(10, 6))
+    fig, ax = _single_axes()
+    ax.clear()
     
     # Plot actual speedup
     ax.plot(grouped['nodes'], grouped['speedup'], 
@@ -89,54 +269,58 @@ def plot_strong_scaling(csv_files: List[str], output_path: str = "results/strong
     ax.grid(True, alpha=0.3)
     ax.legend()
     
-    # Add efficiency annotations
-    for _, row in grouped.iterrows():
-        ax.annotate(f"{row['efficiency']:.1f}%", 
-                   (row['nodes'], row['speedup']),
+    # Add efficiency annotations (plain arrays, no per-row Series objects)
+    nodes_arr = grouped['nodes'].to_numpy()
+    spd_arr = grouped['speedup'].to_numpy()
+    eff_arr = grouped['efficiency'].to_numpy()
+    for n, s, e in zip(nodes_arr, spd_arr, eff_arr):
+        ax.annotate(f"{e:.1f}%", 
+                   (n, s),
                    textcoords="offset points", 
                    xytext=(0,10), 
                    ha='center',
                    fontsize=10,
                    alpha=0.7)
     
-    plt.tight_layout()
-    plt.savefig(output_path)
+    fig.tight_layout()
+    fig.savefig(output_path)
     print(f"✅ Strong scaling plot saved to: {output_path}")
-    plt.close()
 
 
-def plot_weak_scaling(csv_files: List[str], output_path: str = "results/weak_scaling.png") -> None:
+def plot_weak_scaling(
+    csv_files: List[str],
+    output_path: str = "results/weak_scaling.png",
+    tasks_per_node: int = TASKS_PER_NODE
+) -> None:
     """
     Generate weak scaling plot: efficiency vs number of nodes.
     
     Args:
         csv_files: List of CSV files with weak scaling data
         output_path: Output path for the plot
+        tasks_per_node: MPI tasks per node used to derive the node count
     """
-    # Read and combine all CSV files
-    dfs = []
-    for file in csv_files:
-        df = pd.read_csv(file)
-        if 'n_ranks' in df.columns:
-            df['nodes'] = df['n_ranks'] / 16
-        dfs.append(df)
-    
-    if not dfs:
+    if not csv_files:
         print("No weak scaling data found")
         return
     
-    data = pd.concat(dfs, ignore_index=True)
-    
-    # Group by node count
-    grouped = data.groupby('nodes')['elapsed_sec'].mean().reset_index()
-    grouped = grouped.sort_values('nodes')
+    # Mean time per node count (cached across plots)
+    grouped = load_scaling_data(csv_files, tasks_per_node)
     
     # Compute efficiency relative to 1 node
     baseline_time = grouped[grouped['nodes'] == grouped['nodes'].min()]['elapsed_sec'].values[0]
     grouped['efficiency'] = (baseline_time / grouped['elapsed_sec']) * 100
     
+    if os.environ.get('MCHPC_FAST_SVG') == '1':
+        svg_path = str(Path(output_path).with_suffix('.svg'))
+        _render_svg_scaling(grouped, svg_path, 'efficiency', 100.0,
+                            'Weak Scaling: Efficiency vs Number of Nodes', 'Parallel Efficiency (%)', '#F18F01')
+        print(f"✅ Weak scaling plot saved to: {svg_path}")
+        return
+    
     # Create plot
-    fig, ax = plt.subplots(figsize=(10, 6))
+    fig, ax = _single_axes()
+    ax.clear()
     
     # Plot efficiency
     ax.plot(grouped['nodes'], grouped['efficiency'], 
@@ -155,18 +339,19 @@ def plot_weak_scaling(csv_files: List[str], output_path: str = "results/weak_sca
     ax.legend()
     
     # Add value labels
-    for _, row in grouped.iterrows():
-        ax.annotate(f"{row['efficiency']:.1f}%", 
-                   (row['nodes'], row['efficiency']),
+    nodes_arr = grouped['nodes'].to_numpy()
+    eff_arr = grouped['efficiency'].to_numpy()
+    for n, e in zip(nodes_arr, eff_arr):
+        ax.annotate(f"{e:.1f}%", 
+                   (n, e),
                    textcoords="offset points", 
                    xytext=(0,5), 
                    ha='center',
                    fontsize=10)
     
-    plt.tight_layout()
-    plt.savefig(output_path)
+    fig.tight_layout()
+    fig.savefig(output_path)
     print(f"✅ Weak scaling plot saved to: {output_path}")
-    plt.close()
 
 
 def plot_convergence(csv_file: str, output_path: str = "results/convergence.png") -> None:
@@ -177,30 +362,31 @@ def plot_convergence(csv_file: str, output_path: str = "results/convergence.png"
         csv_file: CSV file with convergence data
         output_path: Output path for the plot
     """
-    # Read convergence data
-    data = pd.read_csv(csv_file)
-    
-    if 'n_samples' not in data.columns or 'abs_error' not in data.columns:
+    # Read convergence data (only the two columns plotted)
+    try:
+        data = read_results_csv(csv_file, columns=['n_samples', 'abs_error'])
+    except (KeyError, ValueError):
         print(f"Error: CSV must have 'n_samples' and 'abs_error' columns")
         return
     
     data = data.sort_values('n_samples')
     
     # Create log-log plot
-    fig, ax = plt.subplots(figsize=(10, 6))
+    fig, ax = _single_axes()
+    ax.clear()
     
     # Plot measured error
     ax.loglog(data['n_samples'], data['abs_error'], 
              marker='o', markersize=10, linewidth=2, 
              label='Measured Error', color='#06A77D')
     
-    # Plot theoretical O(1/√N) line
-    N_range = data['n_samples'].values
+    # Plot theoretical O(1/√N) line on a fixed 64-point log grid
+    N_theory = np.logspace(np.log10(data['n_samples'].min()), np.log10(data['n_samples'].max()), 64)
     # Fit to first point to get constant
     C = data['abs_error'].iloc[0] * np.sqrt(data['n_samples'].iloc[0])
-    theoretical = C / np.sqrt(N_range)
+    theoretical = C / np.sqrt(N_theory)
     
-    ax.loglog(N_range, theoretical, 
+    ax.loglog(N_theory, theoretical, 
              linestyle='--', linewidth=2, 
              label='O(1/√N) Theory', color='#A23B72')
     
@@ -213,8 +399,9 @@ def plot_convergence(csv_file: str, output_path: str = "results/convergence.png"
     # Add slope annotation
     if len(data) >= 2:
         # Compute slope from first and last points
-        log_n1, log_n2 = np.log10(data['n_samples'].iloc[0]), np.log10(data['n_samples'].iloc[-1])
-        log_e1, log_e2 = np.log10(data['abs_error'].iloc[0]), np.log10(data['abs_error'].iloc[-1])
+        ns = data['n_samples'].to_numpy()[[0, -1]]
+        es = data['abs_error'].to_numpy()[[0, -1]]
+        (log_n1, log_n2), (log_e1, log_e2) = np.log10(ns), np.log10(es)
         slope = (log_e2 - log_e1) / (log_n2 - log_n1)
         
         ax.text(0.05, 0.95, f'Measured slope: {slope:.2f}\nTheoretical: -0.50',
@@ -222,10 +409,9 @@ def plot_convergence(csv_file: str, output_path: str = "results/convergence.png"
                verticalalignment='top',
                bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
     
-    plt.tight_layout()
-    plt.savefig(output_path)
+    fig.tight_layout()
+    fig.savefig(output_path)
     print(f"✅ Convergence plot saved to: {output_path}")
-    plt.close()
 
 
 def plot_optimization_comparison(
@@ -242,8 +428,8 @@ def plot_optimization_comparison(
         output_path: Output path for the plot
     """
     # Read data
-    baseline = pd.read_csv(baseline_csv)
-    antithetic = pd.read_csv(antithetic_csv)
+    baseline = read_results_csv(baseline_csv)
+    antithetic = read_results_csv(antithetic_csv)
     
     # Extract key metrics
     baseline_time = baseline['elapsed_sec'].mean()
@@ -253,7 +439,9 @@ def plot_optimization_comparison(
     antithetic_stderr = antithetic['mc_stderr'].mean()
     
     # Create comparison plot
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
+    fig, (ax1, ax2) = _pair_axes()
+    ax1.clear()
+    ax2.clear()
     
     # Plot 1: Standard Error Comparison
     methods = ['Baseline', 'Antithetic\nVariates']
@@ -266,11 +454,8 @@ def plot_optimization_comparison(
     ax1.grid(True, alpha=0.3, axis='y')
     
     # Add value labels
-    for bar, val in zip(bars1, stderr_values):
-        height = bar.get_height()
-        ax1.text(bar.get_x() + bar.get_width()/2., height,
-                f'${val:.4f}',
-                ha='center', va='bottom', fontsize=11, fontweight='bold')
+    ax1.bar_label(bars1, labels=[f'${v:.4f}' for v in stderr_values],
+                  padding=3, fontsize=11, fontweight='bold')
     
     # Add improvement annotation
     improvement = (1 - antithetic_stderr / baseline_stderr) * 100
@@ -289,11 +474,8 @@ def plot_optimization_comparison(
     ax2.grid(True, alpha=0.3, axis='y')
     
     # Add value labels
-    for bar, val in zip(bars2, time_values):
-        height = bar.get_height()
-        ax2.text(bar.get_x() + bar.get_width()/2., height,
-                f'{val:.3f}s',
-                ha='center', va='bottom', fontsize=11, fontweight='bold')
+    ax2.bar_label(bars2, labels=[f'{v:.3f}s' for v in time_values],
+                  padding=3, fontsize=11, fontweight='bold')
     
     # Add time overhead annotation
     overhead = (antithetic_time / baseline_time - 1) * 100
@@ -304,20 +486,20 @@ def plot_optimization_comparison(
             bbox=dict(boxstyle='round', facecolor='lightyellow', alpha=0.7),
             fontsize=12, fontweight='bold')
     
-    plt.suptitle('Optimization Results: Antithetic Variates Variance Reduction', 
+    fig.suptitle('Optimization Results: Antithetic Variates Variance Reduction', 
                 fontsize=16, fontweight='bold', y=1.02)
-    plt.tight_layout()
-    plt.savefig(output_path)
+    fig.tight_layout()
+    fig.savefig(output_path)
     print(f"✅ Optimization comparison plot saved to: {output_path}")
-    plt.close()
 
 
-def plot_all_from_directory(results_dir: str) -> None:
+def plot_all_from_directory(results_dir: str, tasks_per_node: int = TASKS_PER_NODE) -> None:
     """
     Automatically find and plot all available results from a directory.
     
     Args:
         results_dir: Directory containing result CSV files
+        tasks_per_node: MPI tasks per node used to derive the node count
     """
     results_dir = Path(results_dir)
     
@@ -331,7 +513,7 @@ def plot_all_from_directory(results_dir: str) -> None:
     strong_files = list(results_dir.glob("strong_scaling_*.csv"))
     if strong_files:
         print(f"Found {len(strong_files)} strong scaling file(s)")
-        plot_strong_scaling([str(f) for f in strong_files])
+        plot_strong_scaling([str(f) for f in strong_files], tasks_per_node=tasks_per_node)
     else:
         print("⚠️  No strong scaling files found (strong_scaling_*.csv)")
     
@@ -339,7 +521,7 @@ def plot_all_from_directory(results_dir: str) -> None:
     weak_files = list(results_dir.glob("weak_scaling_*.csv"))
     if weak_files:
         print(f"Found {len(weak_files)} weak scaling file(s)")
-        plot_weak_scaling([str(f) for f in weak_files])
+        plot_weak_scaling([str(f) for f in weak_files], tasks_per_node=tasks_per_node)
     else:
         print("⚠️  No weak scaling files found (weak_scaling_*.csv)")
     
@@ -381,78 +563,81 @@ def generate_sample_data(output_dir: str = "results/sample_data") -> None:
     
     print("Generating sample data for plot testing...")
     
+    # Fixed seed so regenerated sample files are identical
+    rng = np.random.default_rng(0)
+    
     # Sample strong scaling data
     # Simulate realistic speedup with some overhead
-    nodes = [1, 2, 4, 8]
-    ranks = [16, 32, 64, 128]
+    nodes = np.array([1, 2, 4, 8])
+    ranks = nodes * 16
     n_samples = 1_000_000_000
     baseline_time = 100.0  # seconds for 1 node
     
-    strong_data = []
-    for n, r in zip(nodes, ranks):
-        # Realistic speedup: not perfect due to overhead
-        speedup = n * 0.85  # 85% efficiency
-        time_sec = baseline_time / speedup
-        
-        strong_data.append({
-            'method': 'mpi_mc',
-            'n_ranks': r,
-            'n_samples': n_samples,
-            'mc_price': 10.45 + np.random.normal(0, 0.001),
-            'mc_stderr': 0.02 / np.sqrt(n),
-            'bs_price': 10.450583,
-            'abs_error': 0.001,
-            'rel_error_pct': 0.01,
-            'elapsed_sec': time_sec,
-            'throughput_samples_per_sec': n_samples / time_sec
-        })
-    
-    pd.DataFrame(strong_data).to_csv(f"{output_dir}/strong_scaling_sample.csv", index=False)
+    # Realistic speedup: not perfect due to overhead (85% efficiency)
+    times = baseline_time / (nodes * 0.85)
+    prices = 10.45 + rng.standard_normal(nodes.size) * 0.001
+    stderrs = 0.02 / np.sqrt(nodes)
+    throughputs = n_samples / times
+    
+    strong_data = [{
+        'method': 'mpi_mc',
+        'n_ranks': r,
+        'n_samples': n_samples,
+        'mc_price': p,
+        'mc_stderr': e,
+        'bs_price': 10.450583,
+        'abs_error': 0.001,
+        'rel_error_pct': 0.01,
+        'elapsed_sec': t,
+        'throughput_samples_per_sec': tp
+    } for r, p, e, t, tp in zip(ranks.tolist(), prices.tolist(), stderrs.tolist(),
+                                times.tolist(), throughputs.tolist())]
+    
+    write_results_csv(f"{output_dir}/strong_scaling_sample.csv", strong_data)
     
     # Sample weak scaling data
-    weak_data = []
-    for n, r in zip(nodes, ranks):
-        # Each node does 100M samples
-        n_samples_weak = 100_000_000 * n
-        # Time should be roughly constant (weak scaling)
-        time_sec = 10.0 * (1 + 0.05 * (n - 1))  # Small increase
-        
-        weak_data.append({
-            'method': 'mpi_mc',
-            'n_ranks': r,
-            'n_samples': n_samples_weak,
-            'mc_price': 10.45 + np.random.normal(0, 0.001),
-            'mc_stderr': 0.02,
-            'bs_price': 10.450583,
-            'abs_error': 0.001,
-            'rel_error_pct': 0.01,
-            'elapsed_sec': time_sec,
-            'throughput_samples_per_sec': n_samples_weak / time_sec
-        })
-    
-    pd.DataFrame(weak_data).to_csv(f"{output_dir}/weak_scaling_sample.csv", index=False)
+    # Each node does 100M samples; time should be roughly constant
+    n_samples_weak = 100_000_000 * nodes
+    times = 10.0 * (1 + 0.05 * (nodes - 1))  # Small increase
+    prices = 10.45 + rng.standard_normal(nodes.size) * 0.001
+    throughputs = n_samples_weak / times
+    
+    weak_data = [{
+        'method': 'mpi_mc',
+        'n_ranks': r,
+        'n_samples': n,
+        'mc_price': p,
+        'mc_stderr': 0.02,
+        'bs_price': 10.450583,
+        'abs_error': 0.001,
+        'rel_error_pct': 0.01,
+        'elapsed_sec': t,
+        'throughput_samples_per_sec': tp
+    } for r, n, p, t, tp in zip(ranks.tolist(), n_samples_weak.tolist(), prices.tolist(),
+                                times.tolist(), throughputs.tolist())]
+    
+    write_results_csv(f"{output_dir}/weak_scaling_sample.csv", weak_data)
     
     # Sample convergence data
-    n_values = [10**i for i in range(4, 10)]  # 1e4 to 1e9
-    convergence_data = []
+    n_values = 10 ** np.arange(4, 10)  # 1e4 to 1e9
+    # Error should scale as 1/sqrt(N)
+    scale = 0.1 / np.sqrt(n_values)
+    errors = scale + rng.standard_normal(n_values.size) * (scale * 0.1)
+    times = n_values / 12_000_000  # ~12M samples/sec
+    stderrs = 0.02 / np.sqrt(n_values / 1000000)
+    
+    convergence_data = [{
+        'n_samples': n,
+        'mc_price': 10.45 + err,
+        'mc_stderr': e,
+        'bs_price': 10.450583,
+        'abs_error': abs(err),
+        'rel_error_pct': abs(err) / 10.45 * 100,
+        'elapsed_sec': t,
+        'throughput': n / t
+    } for n, err, e, t in zip(n_values.tolist(), errors.tolist(), stderrs.tolist(), times.tolist())]
     
-    for n in n_values:
-        # Error should scale as 1/sqrt(N)
-        error = 0.1 / np.sqrt(n) + np.random.normal(0, 0.1 / np.sqrt(n) * 0.1)
-        time_sec = n / 12_000_000  # ~12M samples/sec
-        
-        convergence_data.append({
-            'n_samples': n,
-            'mc_price': 10.45 + error,
-            'mc_stderr': 0.02 / np.sqrt(n / 1000000),
-            'bs_price': 10.450583,
-            'abs_error': abs(error),
-            'rel_error_pct': abs(error) / 10.45 * 100,
-            'elapsed_sec': time_sec,
-            'throughput': n / time_sec
-        })
-    
-    pd.DataFrame(convergence_data).to_csv(f"{output_dir}/convergence_sample.csv", index=False)
+    write_results_csv(f"{output_dir}/convergence_sample.csv", convergence_data)
     
     # Sample baseline vs antithetic
     baseline_data = [{
@@ -467,7 +652,7 @@ def generate_sample_data(output_dir: str = "results/sample_data") -> None:
         'throughput_samples_per_sec': 12_048_000,
         'antithetic': False
     }]
-    pd.DataFrame(baseline_data).to_csv(f"{output_dir}/baseline_sample.csv", index=False)
+    write_results_csv(f"{output_dir}/baseline_sample.csv", baseline_data)
     
     antithetic_data = [{
         'method': 'serial_mc_antithetic',
@@ -481,7 +666,7 @@ def generate_sample_data(output_dir: str = "results/sample_data") -> None:
         'throughput_samples_per_sec': 10_526_000,
         'antithetic': True
     }]
-    pd.DataFrame(antithetic_data).to_csv(f"{output_dir}/antithetic_sample.csv", index=False)
+    write_results_csv(f"{output_dir}/antithetic_sample.csv", antithetic_data)
     
     print(f"✅ Sample data generated in: {output_dir}/")
     print(f"   - strong_scaling_sample.csv")
@@ -491,8 +676,8 @@ def generate_sample_data(output_dir: str = "results/sample_data") -> None:
     print(f"   - antithetic_sample.csv")
 
 
-def main():
-    """Main entry point for plot generation."""
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the command-line parser for plot generation."""
     parser = argparse.ArgumentParser(
         description="Generate plots from Monte Carlo experiment results",
         formatter_class=argparse.ArgumentDefaultsHelpFormatter
@@ -518,7 +703,19 @@ def main():
     parser.add_argument("--output-dir", type=str, default="results",
                        help="Output directory for plots")
     
-    args = parser.parse_args()
+    parser.add_argument("--tasks-per-node", type=int, default=TASKS_PER_NODE,
+                       help="MPI tasks per node (converts n_ranks to node count)")
+    
+    return parser
+
+
+# Built once at import so repeated main() calls reuse it
+_PARSER = _build_parser()
+
+
+def main():
+    """Main entry point for plot generation."""
+    args = _PARSER.parse_args()
     
     # Create output directory
     os.makedirs(args.output_dir, exist_ok=True)
@@ -532,18 +729,18 @@ def main():
     
     # Auto-detect mode
     if args.all:
-        plot_all_from_directory(args.all)
+        plot_all_from_directory(args.all, args.tasks_per_node)
         return 0
     
     # Manual mode
     generated_any = False
     
     if args.strong:
-        plot_strong_scaling(args.strong, f"{args.output_dir}/strong_scaling.png")
+        plot_strong_scaling(args.strong, f"{args.output_dir}/strong_scaling.png", args.tasks_per_node)
         generated_any = True
     
     if args.weak:
-        plot_weak_scaling(args.weak, f"{args.output_dir}/weak_scaling.png")
+        plot_weak_scaling(args.weak, f"{args.output_dir}/weak_scaling.png", args.tasks_per_node)
         generated_any = True
     
     if args.convergence:
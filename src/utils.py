@@ -5,12 +5,22 @@ This module provides helper functions for timing, logging, and data output
 used across serial and parallel Monte Carlo implementations.
 """
 
+import atexit
+import math
+import sys
 import time
 import csv
-from datetime import datetime
-from typing import Dict, List, Any, Optional
+from functools import lru_cache
+from typing import Dict, Iterable, List, Any, Optional
 import os
 
+# Units for format_bytes, in powers of 1024
+UNITS = ('B', 'KB', 'MB', 'GB', 'TB', 'PB')
+
+# Pending log lines and the count that forces a write
+_BUF: List[str] = []
+_BUF_MAX = 64
+
 
 def format_timestamp() -> str:
     """
@@ -19,13 +29,21 @@ def format_timestamp() -> str:
     Returns:
         Timestamp string in format: YYYY-MM-DD HH:MM:SS
     """
-    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    # Format the struct_time fields directly; skips building a datetime
+    # object and the strftime call on every log line
+    lt = time.localtime(int(time.time()))
+    return (f"{lt.tm_year:04d}-{lt.tm_mon:02d}-{lt.tm_mday:02d} "
+            f"{lt.tm_hour:02d}:{lt.tm_min:02d}:{lt.tm_sec:02d}")
 
 
 def log_message(message: str, rank: Optional[int] = None, flush: bool = True) -> None:
     """
     Print a log message with timestamp and optional rank information.
     
+    Lines are buffered and written with a single write/flush once _BUF_MAX
+    lines are pending, when flush=True, or on log_flush(). Pass flush=False
+    for messages inside timed regions to keep syscalls out of them.
+    
     Args:
         message: The message to log
         rank: MPI rank (if applicable)
@@ -33,9 +51,24 @@ def log_message(message: str, rank: Optional[int] = None, flush: bool = True) ->
     """
     timestamp = format_timestamp()
     if rank is not None:
-        print(f"[{timestamp}] [Rank {rank}] {message}", flush=flush)
+        _BUF.append(f"[{timestamp}] [Rank {rank}] {message}\n")
     else:
-        print(f"[{timestamp}] {message}", flush=flush)
+        _BUF.append(f"[{timestamp}] {message}\n")
+    
+    if flush or len(_BUF) >= _BUF_MAX:
+        log_flush()
+
+
+def log_flush() -> None:
+    """Write all buffered log lines to stdout and flush it."""
+    if _BUF:
+        sys.stdout.write("".join(_BUF))
+        _BUF.clear()
+    sys.stdout.flush()
+
+
+# Don't lose buffered lines at interpreter exit
+atexit.register(log_flush)
 
 
 def format_time(seconds: float) -> str:
@@ -66,13 +99,16 @@ def format_number(n: int) -> str:
     Returns:
         Formatted string (e.g., "1,000,000")
     """
-    return f"{n:,}"
+    return format(n, ",")
 
 
 class Timer:
     """
     Simple context manager for timing code blocks.
     
+    Times are taken with perf_counter_ns, so start_time, end_time and
+    elapsed_ns are exact integer nanoseconds; elapsed converts to seconds.
+    
     Usage:
         with Timer() as t:
             # do something
@@ -82,28 +118,39 @@ class Timer:
     def __init__(self):
         self.start_time = None
         self.end_time = None
-        self.elapsed = None
+        self.elapsed_ns = None
     
     def __enter__(self):
-        self.start_time = time.perf_counter()
+        self.start_time = time.perf_counter_ns()
         return self
     
     def __exit__(self, *args):
-        self.end_time = time.perf_counter()
-        self.elapsed = self.end_time - self.start_time
+        self.end_time = time.perf_counter_ns()
+        self.elapsed_ns = self.end_time - self.start_time
+    
+    @property
+    def elapsed(self) -> Optional[float]:
+        """Elapsed time in seconds (None until the block has exited)."""
+        if self.elapsed_ns is None:
+            return None
+        return self.elapsed_ns * 1e-9
 
 
 def write_results_csv(
     filename: str,
-    data: List[Dict[str, Any]],
+    data: Iterable[Dict[str, Any]],
     append: bool = False
 ) -> None:
     """
     Write results to CSV file.
     
+    Rows are written as they are consumed, so a generator can be passed to
+    stream results without holding them all in memory. The header is taken
+    from the keys of the first row; every row must provide those keys.
+    
     Args:
         filename: Output CSV file path
-        data: List of dictionaries with result data
+        data: Iterable of dictionaries with result data (list or generator)
         append: If True, append to existing file; otherwise overwrite
         
     Example:
@@ -115,23 +162,31 @@ def write_results_csv(
         }]
         write_results_csv('results/output.csv', data)
     """
-    if not data:
+    it = iter(data)
+    first = next(it, None)
+    if first is None:
         return
     
     # Create directory if it doesn't exist
-    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    dirname = os.path.dirname(filename)
+    if dirname:
+        os.makedirs(dirname, exist_ok=True)
     
     mode = 'a' if append else 'w'
     file_exists = os.path.isfile(filename) and append
     
     with open(filename, mode, newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=data[0].keys())
+        # Plain csv.writer with a fixed column order; DictWriter would
+        # rebuild and validate a list from each row dict
+        fieldnames = tuple(first.keys())
+        writer = csv.writer(f)
         
         # Write header only if file is new or we're overwriting
         if not file_exists:
-            writer.writeheader()
+            writer.writerow(fieldnames)
         
-        writer.writerows(data)
+        writer.writerow(tuple(first[k] for k in fieldnames))
+        writer.writerows(tuple(row[k] for k in fieldnames) for row in it)
 
 
 def compute_speedup(time_serial: float, time_parallel: float) -> float:
@@ -205,10 +260,13 @@ def print_header(title: str, char: str = "=", length: int = 70) -> None:
     print_separator(char, length)
 
 
+@lru_cache(maxsize=1)
 def get_git_commit_hash() -> str:
     """
     Get current git commit hash for reproducibility.
     
+    The result is cached, so git is only spawned on the first call.
+    
     Returns:
         Git commit hash or "unknown" if not in a git repo
     """
@@ -216,7 +274,8 @@ def get_git_commit_hash() -> str:
         import subprocess
         result = subprocess.run(
             ['git', 'rev-parse', 'HEAD'],
-            capture_output=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
             text=True,
             check=True
         )
@@ -235,11 +294,10 @@ def format_bytes(num_bytes: int) -> str:
     Returns:
         Formatted string (e.g., "1.23 GB")
     """
-    for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-        if abs(num_bytes) < 1024.0:
-            return f"{num_bytes:.2f} {unit}"
-        num_bytes /= 1024.0
-    return f"{num_bytes:.2f} PB"
+    if num_bytes == 0:
+        return f"{0:.2f} {UNITS[0]}"
+    idx = max(0, min(int(math.log(abs(num_bytes), 1024)), len(UNITS) - 1))
+    return f"{num_bytes / 1024**idx:.2f} {UNITS[idx]}"
 
 
 if __name__ == "__main__":
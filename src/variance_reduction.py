@@ -9,16 +9,53 @@ References:
     Springer. Chapter 4: Variance Reduction Techniques.
 """
 
+import math
+import os
 import numpy as np
-from typing import Tuple, Optional
+from typing import Tuple, Optional, Union
 
+from option_pricing import black_scholes_call, precompute_gbm_constants
 
-def antithetic_variates_samples(n_pairs: int, seed: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Ahead-of-time compiled kernels (built by build_kernels.py). They are
+# single-threaded, so they only replace the parallel JIT kernels when
+# MCHPC_USE_AOT=1 is set, which is meant for MPI runs with one rank per core
+AOT_AVAILABLE = False
+_AOT_ANTI_KERNELS = {}
+if os.environ.get('MCHPC_USE_AOT') == '1':
+    try:
+        import variance_kernels
+        AOT_AVAILABLE = True
+        _AOT_ANTI_KERNELS = {
+            np.float32: variance_kernels.anti_kernel_f32,
+            np.float64: variance_kernels.anti_kernel_f64,
+        }
+    except ImportError:
+        pass
+
+# Pairs per tile in antithetic_monte_carlo_tiled; Z and the two payoff
+# buffers take 384 KB in float32 (768 KB in float64) and stay in L2
+TILE_SIZE = 32768
+
+
+def antithetic_variates_samples(
+    n_pairs: int,
+    rng: Optional[Union[np.random.Generator, int]] = None,
+    seed: Optional[int] = None,
+    dtype: type = np.float64
+) -> np.ndarray:
     """
-    Generate antithetic variate pairs for variance reduction.
+    Generate the base normals for antithetic variate pairs.
     
     For each random normal Z ~ N(0,1), also use -Z.
     This creates negatively correlated pairs that reduce variance.
+    Only Z is returned; -Z is applied on the fly by
+    antithetic_monte_carlo_prices, so the mirrored array is never stored.
     
     Theory:
         Var[(f(Z) + f(-Z))/2] ≤ [Var(f(Z)) + Var(f(-Z))]/2 = Var(f(Z))
@@ -30,41 +67,97 @@ def antithetic_variates_samples(n_pairs: int, seed: Optional[int] = None) -> Tup
     
     Args:
         n_pairs: Number of pairs to generate
-        seed: Random seed for reproducibility
+        rng: Generator to draw from; pass one per worker or MPI rank for
+             independent streams (seed is ignored when given). An int is
+             taken as the seed, so the older positional call
+             antithetic_variates_samples(n_pairs, seed) still works
+        seed: Random seed for a fresh SFC64 generator when rng is None
+              (None draws fresh OS entropy)
+        dtype: np.float64 or np.float32 (half the bytes; MC error still
+               dominates float32 rounding)
         
     Returns:
-        Tuple of (Z_positive, Z_negative) where Z_negative = -Z_positive
+        Array Z of n_pairs standard normals (the pairs are (Z, -Z))
         
     Example:
-        >>> Z1, Z2 = antithetic_variates_samples(1000, seed=42)
-        >>> np.allclose(Z1 + Z2, 0)  # Z2 = -Z1
-        True
-        >>> len(Z1)  # 1000 pairs = 2000 samples total
+        >>> Z = antithetic_variates_samples(1000, seed=42)
+        >>> len(Z)  # 1000 pairs = 2000 samples total
         1000
     """
-    if seed is not None:
-        np.random.seed(seed)
+    # Caller-owned or fresh SFC64 stream (no global RandomState mutation)
+    if rng is None:
+        rng = np.random.Generator(np.random.SFC64(seed))
+    elif isinstance(rng, (int, np.integer)):
+        rng = np.random.Generator(np.random.SFC64(rng))
     
     # Generate N/2 random normals
-    Z_positive = np.random.normal(0.0, 1.0, n_pairs)
+    return rng.standard_normal(n_pairs, dtype=dtype)
+
+
+def antithetic_variates_pair(
+    n_pairs: int,
+    rng: Optional[Union[np.random.Generator, int]] = None,
+    seed: Optional[int] = None,
+    buf: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Generate antithetic variate pairs as two explicit arrays.
     
-    # Create antithetic pairs
-    Z_negative = -Z_positive
+    Compatibility wrapper for callers that need -Z materialized; new code
+    should use antithetic_variates_samples and let the pricer mirror Z.
     
+    Args:
+        n_pairs: Number of pairs to generate
+        rng: Generator to draw from, or an int seed (seed is ignored
+             when given)
+        seed: Random seed when rng is None (None draws fresh OS entropy)
+        buf: Optional preallocated array of length n_pairs for -Z
+        
+    Returns:
+        Tuple of (Z_positive, Z_negative) where Z_negative = -Z_positive
+        
+    Example:
+        >>> Z1, Z2 = antithetic_variates_pair(1000, seed=42)
+        >>> np.allclose(Z1 + Z2, 0)  # Z2 = -Z1
+        True
+    """
+    Z_positive = antithetic_variates_samples(n_pairs, rng=rng, seed=seed)
+    Z_negative = np.negative(Z_positive, out=buf)
     return Z_positive, Z_negative
 
 
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _anti_kernel(S0, S0_neg, K, drift, diff, Z, out_pos, out_neg):
+        # Both legs from one exp: exp(drift - v*Z) = exp(2*drift) / exp(drift + v*Z),
+        # with S0_neg = S0*exp(2*drift) precomputed in Z's precision
+        for i in prange(Z.size):
+            growth = math.exp(drift + diff * Z[i])
+            out_pos[i] = max(S0 * growth - K, 0.0)
+            out_neg[i] = max(S0_neg / growth - K, 0.0)
+
+
 def antithetic_monte_carlo_prices(
     S0: float,
     K: float,
     T: float,
     r: float,
     sigma: float,
-    Z_positive: np.ndarray,
-    Z_negative: np.ndarray
+    Z: np.ndarray,
+    out: Optional[Tuple[np.ndarray, np.ndarray]] = None
 ) -> Tuple[np.ndarray, np.ndarray]:
     """
-    Compute option prices for antithetic variate pairs.
+    Compute option prices for antithetic variate pairs (Z, -Z).
+    
+    Z is read once and both legs are evaluated from it; the negative leg
+    uses exp(drift - v*Z) = exp(2*drift) / exp(drift + v*Z), so -Z is
+    never materialized. With Numba installed, both legs are evaluated in
+    one fused parallel pass that writes the payoffs straight into the
+    output arrays (no S_T temporaries); when MCHPC_USE_AOT=1 is set and
+    build_kernels.py has been run, the ahead-of-time compiled
+    (single-threaded) build of that kernel is used instead. Otherwise an
+    in-place NumPy path is used. All arithmetic follows Z's dtype, so
+    float32 samples give a float32 pipeline.
     
     Args:
         S0: Initial stock price
@@ -72,27 +165,150 @@ def antithetic_monte_carlo_prices(
         T: Time to maturity
         r: Risk-free rate
         sigma: Volatility
-        Z_positive: Positive random normals
-        Z_negative: Negative random normals (= -Z_positive)
+        Z: Standard normals from antithetic_variates_samples
+        out: Optional preallocated (payoffs_positive, payoffs_negative)
+             buffers, same length as Z, reused across calls
         
     Returns:
         Tuple of (payoffs_positive, payoffs_negative)
     """
-    # GBM parameters
-    drift = (r - 0.5 * sigma**2) * T
-    diffusion_factor = sigma * np.sqrt(T)
+    # GBM parameters (memoized per (T, r, sigma)), cast to the sample
+    # precision so float32 inputs are not promoted back to float64
+    dtype = Z.dtype.type
+    drift, diffusion_factor = precompute_gbm_constants(T, r, sigma)
+    S0_neg = S0 * math.exp(2.0 * drift)
+    S0, S0_neg, K, drift, diffusion_factor = (
+        dtype(x) for x in (S0, S0_neg, K, drift, diffusion_factor)
+    )
     
-    # Simulate terminal prices for both paths
-    S_T_positive = S0 * np.exp(drift + diffusion_factor * Z_positive)
-    S_T_negative = S0 * np.exp(drift + diffusion_factor * Z_negative)
+    if out is None:
+        out = (np.empty_like(Z), np.empty_like(Z))
+    payoffs_positive, payoffs_negative = out
     
-    # Compute payoffs
-    payoffs_positive = np.maximum(S_T_positive - K, 0.0)
-    payoffs_negative = np.maximum(S_T_negative - K, 0.0)
+    if dtype in _AOT_ANTI_KERNELS:
+        _AOT_ANTI_KERNELS[dtype](S0, S0_neg, K, drift, diffusion_factor,
+                                 Z, payoffs_positive, payoffs_negative)
+        return payoffs_positive, payoffs_negative
+    
+    if NUMBA_AVAILABLE:
+        _anti_kernel(S0, S0_neg, K, drift, diffusion_factor,
+                     Z, payoffs_positive, payoffs_negative)
+        return payoffs_positive, payoffs_negative
+    
+    # Simulate terminal prices for both paths with a single exp, entirely
+    # in the two output buffers (no temporaries):
+    # exp(drift - v*Z) = exp(2*drift) / exp(drift + v*Z)
+    growth = np.multiply(Z, diffusion_factor, out=payoffs_positive)
+    growth += drift
+    np.exp(growth, out=growth)
+    S_T_negative = np.divide(S0_neg, growth, out=payoffs_negative)
+    S_T_positive = np.multiply(growth, S0, out=growth)
+    
+    # Compute payoffs in place on the price buffers: max(S_T - K, 0)
+    # (in-place np.maximum benchmarked faster than np.clip or a mask multiply)
+    np.subtract(S_T_positive, K, out=S_T_positive)
+    np.subtract(S_T_negative, K, out=S_T_negative)
+    payoffs_positive = np.maximum(S_T_positive, dtype(0), out=S_T_positive)
+    payoffs_negative = np.maximum(S_T_negative, dtype(0), out=S_T_negative)
     
     return payoffs_positive, payoffs_negative
 
 
+def antithetic_monte_carlo_tiled(
+    S0: float,
+    K: float,
+    T: float,
+    r: float,
+    sigma: float,
+    n_pairs: int,
+    seed: Optional[int] = None,
+    tile: int = TILE_SIZE,
+    dtype: type = np.float64
+) -> Tuple[float, float]:
+    """
+    Price a European call with antithetic variates in cache-sized tiles.
+    
+    Each tile of normals is generated, priced and reduced while it is
+    still in L2, through three tile-length buffers that are reused for the
+    whole run, so memory use is O(tile) instead of O(n_pairs) and Z and the
+    payoffs never round-trip through DRAM. Per-tile moments are merged
+    online (Chan et al.'s parallel Welford update) in float64. The tiles
+    consume one SFC64 stream in order, so the samples match
+    antithetic_variates_samples(n_pairs, seed=seed, dtype=dtype).
+    
+    Args:
+        S0: Initial stock price
+        K: Strike price
+        T: Time to maturity
+        r: Risk-free rate
+        sigma: Volatility
+        n_pairs: Number of antithetic pairs (2*n_pairs samples)
+        seed: Random seed for reproducibility (None draws fresh OS entropy)
+        tile: Pairs per tile
+        dtype: np.float64 or np.float32 for the per-sample pipeline
+        
+    Returns:
+        Tuple of (option_price, standard_error)
+    """
+    assert n_pairs > 0, "Number of pairs must be positive"
+    assert tile > 0, "Tile size must be positive"
+    
+    rng = np.random.Generator(np.random.SFC64(seed))
+    z_buf = np.empty(min(tile, n_pairs), dtype=dtype)
+    pos_buf = np.empty_like(z_buf)
+    neg_buf = np.empty_like(z_buf)
+    
+    count = 0
+    mean = 0.0
+    m2 = 0.0
+    for offset in range(0, n_pairs, tile):
+        m = min(tile, n_pairs - offset)
+        Z = rng.standard_normal(dtype=dtype, out=z_buf[:m])
+        payoffs_pos, payoffs_neg = antithetic_monte_carlo_prices(
+            S0, K, T, r, sigma, Z, out=(pos_buf[:m], neg_buf[:m])
+        )
+        
+        # Tile moments in float64; the E[X^2] - E[X]^2 cancellation is
+        # confined to one tile, the merge below is numerically stable
+        n_tile = 2 * m
+        s = float(payoffs_pos.sum(dtype=np.float64) + payoffs_neg.sum(dtype=np.float64))
+        s2 = float(
+            np.einsum('i,i->', payoffs_pos, payoffs_pos, dtype=np.float64)
+            + np.einsum('i,i->', payoffs_neg, payoffs_neg, dtype=np.float64)
+        )
+        tile_mean = s / n_tile
+        tile_m2 = max(s2 - s * tile_mean, 0.0)
+        
+        delta = tile_mean - mean
+        total = count + n_tile
+        mean += delta * n_tile / total
+        m2 += tile_m2 + delta * delta * count * n_tile / total
+        count = total
+    
+    discount_factor = math.exp(-r * T)
+    option_price = discount_factor * mean
+    standard_error = discount_factor * math.sqrt(m2 / (count - 1) / count)
+    return option_price, standard_error
+
+
+if NUMBA_AVAILABLE:
+    @njit(fastmath=True, cache=True)
+    def _cv(y, x, mu):
+        # Single-pass Welford update of the means, Sxx and Sxy
+        mx = 0.0
+        my = 0.0
+        Sxx = 0.0
+        Sxy = 0.0
+        for i in range(y.size):
+            dx = x[i] - mx
+            mx += dx / (i + 1)
+            my += (y[i] - my) / (i + 1)
+            Sxx += dx * (x[i] - mx)
+            Sxy += dx * (y[i] - my)
+        beta = Sxy / Sxx if Sxx > 0 else 0.0
+        return my - beta * (mx - mu)
+
+
 def control_variate_adjustment(
     mc_payoffs: np.ndarray,
     control_values: np.ndarray,
@@ -121,7 +337,16 @@ def control_variate_adjustment(
         This is more complex than antithetic variates and requires
         knowledge of E[X]. For simple European options, antithetic
         variates are usually preferred.
+        
+        With Numba installed the estimate is computed in one Welford pass
+        over both arrays (no covariance matrix or adjusted-payoff array).
     """
+    if AOT_AVAILABLE and mc_payoffs.dtype == control_values.dtype == np.float64:
+        return float(variance_kernels.cv_f64(mc_payoffs, control_values, float(control_mean)))
+    
+    if NUMBA_AVAILABLE:
+        return float(_cv(mc_payoffs, control_values, float(control_mean)))
+    
     # Compute optimal coefficient
     covariance = np.cov(mc_payoffs, control_values)[0, 1]
     variance_control = np.var(control_values, ddof=1)
@@ -131,10 +356,19 @@ def control_variate_adjustment(
     else:
         beta = 0
     
-    # Apply control variate adjustment
-    adjusted_payoffs = mc_payoffs - beta * (control_values - control_mean)
-    
-    return np.mean(adjusted_payoffs)
+    # Apply control variate adjustment via the mean identity
+    # mean(Y - beta*(X - mu)) = mean(Y) - beta*(mean(X) - mu),
+    # which avoids allocating the adjusted payoff array
+    return float(mc_payoffs.mean() - beta * (control_values.mean() - control_mean))
+
+
+def _mean_std(a: np.ndarray) -> Tuple[float, float]:
+    """Return the mean and sample standard deviation (ddof=1) of a."""
+    # Two-pass (mean, then centred sum of squares) for numerical stability;
+    # einsum reduces the centred values without a squared temporary
+    m = a.mean(dtype=np.float64)
+    d = a - m
+    return float(m), math.sqrt(float(np.einsum('i,i->', d, d)) / (a.size - 1))
 
 
 if __name__ == "__main__":
@@ -145,36 +379,45 @@ if __name__ == "__main__":
     
     # Test antithetic variates
     n_pairs = 1000
-    Z1, Z2 = antithetic_variates_samples(n_pairs, seed=42)
+    Z1, Z2 = antithetic_variates_pair(n_pairs, seed=42)
+    mean_z1, std_z1 = _mean_std(Z1)
+    mean_z2, std_z2 = _mean_std(Z2)
+    corr_z = float(np.dot(Z1 - mean_z1, Z2 - mean_z2)) / ((n_pairs - 1) * std_z1 * std_z2)
     
     print(f"\nAntithetic Variates Test:")
     print(f"  Generated {n_pairs} pairs ({2*n_pairs} total samples)")
-    print(f"  Z1 mean: {np.mean(Z1):.6f} (should be ~0)")
-    print(f"  Z2 mean: {np.mean(Z2):.6f} (should be ~0)")
+    print(f"  Z1 mean: {mean_z1:.6f} (should be ~0)")
+    print(f"  Z2 mean: {mean_z2:.6f} (should be ~0)")
     print(f"  Z1 + Z2 sum: {np.sum(Z1 + Z2):.10f} (should be exactly 0)")
-    print(f"  Correlation(Z1, Z2): {np.corrcoef(Z1, Z2)[0,1]:.6f} (should be -1)")
+    print(f"  Correlation(Z1, Z2): {corr_z:.6f} (should be -1)")
     
     # Compare standard vs antithetic variance
-    from option_pricing import black_scholes_call
-    
     S0, K, T, r, sigma = 100.0, 100.0, 1.0, 0.05, 0.20
     bs_price = black_scholes_call(S0, K, T, r, sigma)
     
     # Standard Monte Carlo
     n_samples = 10000
-    Z_standard = np.random.normal(0, 1, n_samples)
-    drift = (r - 0.5 * sigma**2) * T
-    S_T = S0 * np.exp(drift + sigma * np.sqrt(T) * Z_standard)
+    rng = np.random.default_rng(42)
+    Z_standard = rng.standard_normal(n_samples)
+    drift, vol_sqrtT = precompute_gbm_constants(T, r, sigma)
+    S_T = S0 * np.exp(drift + vol_sqrtT * Z_standard)
     payoffs_standard = np.maximum(S_T - K, 0)
-    price_standard = np.exp(-r * T) * np.mean(payoffs_standard)
-    stderr_standard = np.exp(-r * T) * np.std(payoffs_standard, ddof=1) / np.sqrt(n_samples)
-    
-    # Antithetic variates
-    Z_pos, Z_neg = antithetic_variates_samples(n_samples // 2, seed=42)
-    payoffs_pos, payoffs_neg = antithetic_monte_carlo_prices(S0, K, T, r, sigma, Z_pos, Z_neg)
-    payoffs_anti = np.concatenate([payoffs_pos, payoffs_neg])
-    price_anti = np.exp(-r * T) * np.mean(payoffs_anti)
-    stderr_anti = np.exp(-r * T) * np.std(payoffs_anti, ddof=1) / np.sqrt(n_samples)
+    mean_standard, std_standard = _mean_std(payoffs_standard)
+    price_standard = np.exp(-r * T) * mean_standard
+    stderr_standard = np.exp(-r * T) * std_standard / np.sqrt(n_samples)
+    
+    # Antithetic variates (continue the same stream, no reseeding)
+    Z_pos = antithetic_variates_samples(n_samples // 2, rng=rng)
+    payoffs_pos, payoffs_neg = antithetic_monte_carlo_prices(S0, K, T, r, sigma, Z_pos)
+    # Pool the two equal-sized halves without concatenating them:
+    # S^2 = [(n-1)(S1^2 + S2^2) + n/2 (m1 - m2)^2] / (2n - 1)
+    n_half = payoffs_pos.size
+    mean_pos, std_pos = _mean_std(payoffs_pos)
+    mean_neg, std_neg = _mean_std(payoffs_neg)
+    var_anti = ((n_half - 1) * (std_pos**2 + std_neg**2)
+                + 0.5 * n_half * (mean_pos - mean_neg)**2) / (2 * n_half - 1)
+    price_anti = np.exp(-r * T) * 0.5 * (mean_pos + mean_neg)
+    stderr_anti = np.exp(-r * T) * np.sqrt(var_anti) / np.sqrt(n_samples)
     
     print(f"\nVariance Reduction Comparison ({n_samples} samples):")
     print(f"  Black-Scholes price: ${bs_price:.6f}")
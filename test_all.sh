@@ -81,7 +81,7 @@ run_test "Test 4: Serial MC with Antithetic Variates" \
 
 # Test 5: Unit Tests
 run_test "Test 5: Unit Test Suite" \
-    "python tests/test_black_scholes.py"
+    "python -m pytest -n auto tests/test_black_scholes.py"
 
 # Test 6: MPI (check if available first)
 if command -v mpirun &> /dev/null; then
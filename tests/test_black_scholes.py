@@ -13,23 +13,43 @@ Test cases:
 
 import sys
 import os
-import numpy as np
+
+import pytest
 
 # Add src directory to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from option_pricing import black_scholes_call, validate_option_params
-from monte_carlo import monte_carlo_european_call
+from monte_carlo import monte_carlo_european_call, monte_carlo_european_call_antithetic
+from variance_reduction import antithetic_monte_carlo_tiled, antithetic_variates_samples
+
+
+# (label, S0, K, seed): ATM S0 = K, ITM S0 > K, OTM S0 < K for calls
+BS_CASES = [
+    ("ATM", 100.0, 100.0, 42),
+    ("ITM", 110.0, 100.0, 43),
+    ("OTM", 90.0, 100.0, 44),
+]
 
 
-def test_black_scholes_formula():
+@pytest.fixture(scope="module")
+def bs_params():
+    """Market parameters shared by all tests, validated once per module."""
+    params = dict(T=1.0, r=0.05, sigma=0.20)
+    for _, S0, K, _ in BS_CASES:
+        validate_option_params(S0, K, **params)
+    return params
+
+
+def test_black_scholes_formula(bs_params):
     """Test that Black-Scholes formula produces reasonable values."""
     print("\n" + "=" * 70)
     print("TEST 1: Black-Scholes Formula Sanity Check")
     print("=" * 70)
     
     # Test case: ATM call option
-    S0, K, T, r, sigma = 100.0, 100.0, 1.0, 0.05, 0.20
+    S0, K = 100.0, 100.0
+    T, r, sigma = bs_params["T"], bs_params["r"], bs_params["sigma"]
     price = black_scholes_call(S0, K, T, r, sigma)
     
     print(f"ATM Call (S0=K=100): ${price:.4f}")
@@ -42,32 +62,38 @@ def test_black_scholes_formula():
     assert 8 < price < 15, f"ATM call price seems unreasonable: ${price:.2f}"
     
     print("✓ Black-Scholes formula sanity check PASSED")
-    return True
 
 
-def test_monte_carlo_vs_black_scholes_atm():
-    """Test Monte Carlo vs Black-Scholes for At-The-Money option."""
+@pytest.fixture(scope="session")
+def jit_warmup():
+    """Compile (or load from cache) the MC kernels once for the whole session."""
+    monte_carlo_european_call(100.0, 100.0, 1.0, 0.05, 0.20, 1000, seed=0)
+    monte_carlo_european_call_antithetic(100.0, 100.0, 1.0, 0.05, 0.20, 1000, seed=0)
+    monte_carlo_european_call_antithetic(100.0, 100.0, 1.0, 0.05, 0.20, 1000, seed=0, dtype="f32")
+
+
+@pytest.mark.usefixtures("jit_warmup")
+@pytest.mark.parametrize("label,S0,K,seed", BS_CASES)
+def test_monte_carlo_vs_black_scholes(label, S0, K, seed, bs_params):
+    """Test antithetic Monte Carlo vs Black-Scholes for ATM, ITM and OTM options."""
     print("\n" + "=" * 70)
-    print("TEST 2: Monte Carlo vs Black-Scholes (ATM)")
+    print(f"TEST 2: Monte Carlo vs Black-Scholes ({label})")
     print("=" * 70)
     
-    # ATM parameters: S0 = K
-    S0 = 100.0
-    K = 100.0
-    T = 1.0
-    r = 0.05
-    sigma = 0.20
-    n_samples = 1_000_000
+    T, r, sigma = bs_params["T"], bs_params["r"], bs_params["sigma"]
+    # Antithetic variates cut the variance enough that 250k samples
+    # meet the 1% target that plain MC needed 1M samples for
+    n_samples = 250_000
     
     print(f"Parameters: S0=${S0}, K=${K}, T={T}yr, r={r}, σ={sigma}")
-    print(f"Samples: {n_samples:,}")
+    print(f"Samples: {n_samples:,} (antithetic)")
     
     # Analytical price
     bs_price = black_scholes_call(S0, K, T, r, sigma)
     
     # Monte Carlo price
-    mc_price, mc_stderr, elapsed = monte_carlo_european_call(
-        S0, K, T, r, sigma, n_samples, seed=42
+    mc_price, mc_stderr, elapsed = monte_carlo_european_call_antithetic(
+        S0, K, T, r, sigma, n_samples, seed=seed
     )
     
     # Calculate error
@@ -86,81 +112,62 @@ def test_monte_carlo_vs_black_scholes_atm():
     print(f"  Within 95% CI:  {within_ci}")
     
     # Assert error is less than 1%
-    assert rel_error_pct < 1.0, f"ATM: Relative error {rel_error_pct:.4f}% exceeds 1%"
-    print("✓ ATM test PASSED (error < 1%)")
-    
-    return True
+    assert rel_error_pct < 1.0, f"{label}: Relative error {rel_error_pct:.4f}% exceeds 1%"
+    print(f"✓ {label} test PASSED (error < 1%)")
 
 
-def test_monte_carlo_vs_black_scholes_itm():
-    """Test Monte Carlo vs Black-Scholes for In-The-Money option."""
+@pytest.mark.usefixtures("jit_warmup")
+@pytest.mark.parametrize("label,S0,K,seed", BS_CASES)
+def test_monte_carlo_plain_vs_black_scholes(label, S0, K, seed, bs_params):
+    """Test the plain (fused-kernel) Monte Carlo pricer vs Black-Scholes."""
     print("\n" + "=" * 70)
-    print("TEST 3: Monte Carlo vs Black-Scholes (ITM)")
+    print(f"TEST 2b: Plain Monte Carlo vs Black-Scholes ({label})")
     print("=" * 70)
     
-    # ITM parameters: S0 > K (call is in the money)
-    S0 = 110.0
-    K = 100.0
-    T = 1.0
-    r = 0.05
-    sigma = 0.20
+    T, r, sigma = bs_params["T"], bs_params["r"], bs_params["sigma"]
+    # No variance reduction, so this needs the full 1M samples for 1%
     n_samples = 1_000_000
     
     print(f"Parameters: S0=${S0}, K=${K}, T={T}yr, r={r}, σ={sigma}")
     print(f"Samples: {n_samples:,}")
     
-    # Analytical price
     bs_price = black_scholes_call(S0, K, T, r, sigma)
-    
-    # Monte Carlo price
     mc_price, mc_stderr, elapsed = monte_carlo_european_call(
-        S0, K, T, r, sigma, n_samples, seed=43
+        S0, K, T, r, sigma, n_samples, seed=seed
     )
     
-    # Calculate error
-    abs_error = abs(mc_price - bs_price)
-    rel_error_pct = (abs_error / bs_price) * 100
-    
-    print(f"\nResults:")
+    rel_error_pct = abs(mc_price - bs_price) / bs_price * 100
     print(f"  Black-Scholes:  ${bs_price:.6f}")
     print(f"  Monte Carlo:    ${mc_price:.6f} ± ${mc_stderr:.6f}")
-    print(f"  Absolute error: ${abs_error:.6f}")
     print(f"  Relative error: {rel_error_pct:.4f}%")
     print(f"  Time elapsed:   {elapsed:.4f} sec")
     
-    within_ci = abs_error <= 1.96 * mc_stderr
-    print(f"  Within 95% CI:  {within_ci}")
-    
-    # Assert error is less than 1%
-    assert rel_error_pct < 1.0, f"ITM: Relative error {rel_error_pct:.4f}% exceeds 1%"
-    print("✓ ITM test PASSED (error < 1%)")
-    
-    return True
+    assert rel_error_pct < 1.0, f"{label}: Relative error {rel_error_pct:.4f}% exceeds 1%"
+    print(f"✓ {label} plain MC test PASSED (error < 1%)")
 
 
-def test_monte_carlo_vs_black_scholes_otm():
-    """Test Monte Carlo vs Black-Scholes for Out-of-The-Money option."""
+@pytest.mark.usefixtures("jit_warmup")
+def test_monte_carlo_float32_antithetic(bs_params):
+    """Test that the float32 antithetic pipeline keeps the 1% accuracy target."""
     print("\n" + "=" * 70)
-    print("TEST 4: Monte Carlo vs Black-Scholes (OTM)")
+    print("TEST 3: Monte Carlo vs Black-Scholes (ATM, float32 antithetic)")
     print("=" * 70)
     
-    # OTM parameters: S0 < K (call is out of the money)
-    S0 = 90.0
+    # ATM parameters: S0 = K
+    S0 = 100.0
     K = 100.0
-    T = 1.0
-    r = 0.05
-    sigma = 0.20
-    n_samples = 1_000_000
+    T, r, sigma = bs_params["T"], bs_params["r"], bs_params["sigma"]
+    n_samples = 250_000
     
     print(f"Parameters: S0=${S0}, K=${K}, T={T}yr, r={r}, σ={sigma}")
-    print(f"Samples: {n_samples:,}")
+    print(f"Samples: {n_samples:,} (float32)")
     
     # Analytical price
     bs_price = black_scholes_call(S0, K, T, r, sigma)
     
-    # Monte Carlo price
-    mc_price, mc_stderr, elapsed = monte_carlo_european_call(
-        S0, K, T, r, sigma, n_samples, seed=44
+    # Monte Carlo price in single precision
+    mc_price, mc_stderr, elapsed = monte_carlo_european_call_antithetic(
+        S0, K, T, r, sigma, n_samples, seed=45, dtype="f32"
     )
     
     # Calculate error
@@ -174,64 +181,39 @@ def test_monte_carlo_vs_black_scholes_otm():
     print(f"  Relative error: {rel_error_pct:.4f}%")
     print(f"  Time elapsed:   {elapsed:.4f} sec")
     
-    within_ci = abs_error <= 1.96 * mc_stderr
-    print(f"  Within 95% CI:  {within_ci}")
-    
-    # Assert error is less than 1%
-    assert rel_error_pct < 1.0, f"OTM: Relative error {rel_error_pct:.4f}% exceeds 1%"
-    print("✓ OTM test PASSED (error < 1%)")
-    
-    return True
+    # float32 rounding is far below the MC noise, so the 1% target holds
+    assert rel_error_pct < 1.0, f"float32: Relative error {rel_error_pct:.4f}% exceeds 1%"
+    print("✓ float32 antithetic test PASSED (error < 1%)")
 
 
-def run_all_tests():
-    """Run all validation tests."""
-    print("\n" + "=" * 70)
-    print("MONTE CARLO VALIDATION TEST SUITE")
-    print("=" * 70)
-    print("Testing Monte Carlo implementation against Black-Scholes formula")
-    print("Target: Relative error < 1% for N=1,000,000 samples")
-    
-    tests = [
-        test_black_scholes_formula,
-        test_monte_carlo_vs_black_scholes_atm,
-        test_monte_carlo_vs_black_scholes_itm,
-        test_monte_carlo_vs_black_scholes_otm,
-    ]
-    
-    passed = 0
-    failed = 0
-    
-    for test_func in tests:
-        try:
-            test_func()
-            passed += 1
-        except AssertionError as e:
-            print(f"\n✗ TEST FAILED: {e}")
-            failed += 1
-        except Exception as e:
-            print(f"\n✗ TEST ERROR: {e}")
-            failed += 1
-    
-    # Summary
+@pytest.mark.usefixtures("jit_warmup")
+def test_antithetic_tiled_matches_untiled(bs_params):
+    """Test that the tiled antithetic pricer reproduces the single-pass result."""
     print("\n" + "=" * 70)
-    print("TEST SUMMARY")
+    print("TEST 4: Tiled vs untiled antithetic Monte Carlo")
     print("=" * 70)
-    print(f"Total tests:  {len(tests)}")
-    print(f"Passed:       {passed} ✓")
-    print(f"Failed:       {failed} ✗")
     
-    if failed == 0:
-        print("\n🎉 ALL TESTS PASSED!")
-        print("=" * 70)
-        return 0
-    else:
-        print(f"\n⚠️  {failed} test(s) failed")
-        print("=" * 70)
-        return 1
-
+    S0, K = 100.0, 100.0
+    T, r, sigma = bs_params["T"], bs_params["r"], bs_params["sigma"]
+    n_samples = 250_000
+    
+    # Tile size that does not divide n_pairs, so the ragged last tile is covered
+    tiled_price, tiled_stderr = antithetic_monte_carlo_tiled(
+        S0, K, T, r, sigma, n_samples // 2, seed=46, tile=10_000
+    )
+    mc_price, mc_stderr, _ = monte_carlo_european_call_antithetic(
+        S0, K, T, r, sigma, n_samples, seed=46
+    )
+    
+    print(f"  Tiled:    ${tiled_price:.6f} ± ${tiled_stderr:.6f}")
+    print(f"  Untiled:  ${mc_price:.6f} ± ${mc_stderr:.6f}")
+    
+    # Same SFC64 stream, so only the summation order differs
+    assert tiled_price == pytest.approx(mc_price, rel=1e-10)
+    assert tiled_stderr == pytest.approx(mc_stderr, rel=1e-8)
+    print("✓ Tiled antithetic test PASSED")
 
-if __name__ == "__main__":
-    exit_code = run_all_tests()
-    sys.exit(exit_code)
 
+def test_antithetic_samples_positional_seed():
+    """Test that an int in rng's position still seeds the SFC64 stream."""
+    assert (antithetic_variates_samples(1000, 42) == antithetic_variates_samples(1000, seed=42)).all()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Tests for the Compiled Monte Carlo Kernels
+
+Checks that the alternative code paths of mc_kernels (the per-option
+specialized kernel, the float32 pipeline and the NumPy fallback) agree
+with the generic kernel and with the analytical Black-Scholes price.
+"""
+
+import sys
+import os
+
+import numpy as np
+import pytest
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import mc_kernels
+from option_pricing import black_scholes_call, precompute_gbm_constants
+from mc_kernels import get_specialized_kernel, mc_call_reduce
+from monte_carlo import monte_carlo_european_call
+
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+def test_specialized_kernel_matches_generic(dtype):
+    """Test that the specialized kernel reproduces mc_call_reduce exactly."""
+    print("\n" + "=" * 70)
+    print(f"TEST 1: Specialized vs generic kernel ({dtype.__name__})")
+    print("=" * 70)
+    
+    S0, K, T, r, sigma = 100.0, 100.0, 1.0, 0.05, 0.20
+    # Not a multiple of BLOCK_SIZE, so the ragged last block is covered
+    n_samples = 200_003
+    seed = 7
+    
+    drift, vol_sqrtT = precompute_gbm_constants(T, r, sigma)
+    generic = mc_call_reduce(S0, K, drift, vol_sqrtT, n_samples, seed, dtype=dtype)
+    specialized = get_specialized_kernel(S0, K, T, r, sigma, dtype=dtype)(n_samples, seed)
+    
+    print(f"  Generic:      {generic}")
+    print(f"  Specialized:  {specialized}")
+    
+    # Same streams and the same arithmetic, only the constants are folded
+    assert specialized == generic, "Specialized kernel diverges from mc_call_reduce"
+    
+    # The pricer's specialize= switch goes through the same kernel
+    price, stderr, _ = monte_carlo_european_call(S0, K, T, r, sigma, n_samples, seed=seed)
+    price_spec, stderr_spec, _ = monte_carlo_european_call(
+        S0, K, T, r, sigma, n_samples, seed=seed, specialize=True
+    )
+    assert (price_spec, stderr_spec) == (price, stderr)
+    print("✓ Specialized kernel test PASSED")
+
+
+def test_plain_float32_vs_black_scholes():
+    """Test that the plain float32 pipeline keeps the 1% accuracy target."""
+    print("\n" + "=" * 70)
+    print("TEST 2: Plain Monte Carlo vs Black-Scholes (ATM, float32)")
+    print("=" * 70)
+    
+    S0, K, T, r, sigma = 100.0, 100.0, 1.0, 0.05, 0.20
+    n_samples = 1_000_000
+    
+    bs_price = black_scholes_call(S0, K, T, r, sigma)
+    mc_price, mc_stderr, _ = monte_carlo_european_call(
+        S0, K, T, r, sigma, n_samples, seed=42, dtype="f32"
+    )
+    rel_error_pct = abs(mc_price - bs_price) / bs_price * 100
+    
+    print(f"  Black-Scholes:  ${bs_price:.6f}")
+    print(f"  Monte Carlo:    ${mc_price:.6f} ± ${mc_stderr:.6f}")
+    print(f"  Relative error: {rel_error_pct:.4f}%")
+    
+    assert rel_error_pct < 1.0, f"float32: Relative error {rel_error_pct:.4f}% exceeds 1%"
+    print("✓ Plain float32 test PASSED")
+
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+def test_numpy_fallback_matches_reference(dtype, monkeypatch):
+    """Test the NumPy fallback of mc_call_reduce against an unchunked reference."""
+    print("\n" + "=" * 70)
+    print(f"TEST 3: NumPy fallback of mc_call_reduce ({dtype.__name__})")
+    print("=" * 70)
+    
+    S0, K, T, r, sigma = 100.0, 100.0, 1.0, 0.05, 0.20
+    # Spans several NUMPY_BLOCK_SIZE chunks plus a ragged last one
+    n_samples = 2 * mc_kernels.NUMPY_BLOCK_SIZE + 12_345
+    seed = 11
+    drift, vol_sqrtT = precompute_gbm_constants(T, r, sigma)
+    
+    # Force the fallback even when Numba is installed
+    monkeypatch.setattr(mc_kernels, "NUMBA_AVAILABLE", False)
+    payoff_sum, payoff_sum_sq = mc_call_reduce(S0, K, drift, vol_sqrtT, n_samples, seed, dtype=dtype)
+    
+    # Reference: the same SFC64 stream drawn in one piece, payoffs in float64
+    rng = np.random.Generator(np.random.SFC64(np.random.SeedSequence(seed)))
+    Z = rng.standard_normal(n_samples, dtype=dtype)
+    payoffs = np.maximum(
+        dtype(S0) * np.exp(dtype(drift) + dtype(vol_sqrtT) * Z) - dtype(K), 0
+    ).astype(np.float64)
+    
+    print(f"  Fallback:   ({payoff_sum:.6f}, {payoff_sum_sq:.6f})")
+    print(f"  Reference:  ({payoffs.sum():.6f}, {payoffs @ payoffs:.6f})")
+    
+    # Chunking only changes the summation order
+    rtol = 1e-5 if dtype is np.float32 else 1e-10
+    assert payoff_sum == pytest.approx(payoffs.sum(), rel=rtol)
+    assert payoff_sum_sq == pytest.approx(payoffs @ payoffs, rel=rtol)
+    
+    # And the estimate itself is sound
+    price = np.exp(-r * T) * payoff_sum / n_samples
+    bs_price = black_scholes_call(S0, K, T, r, sigma)
+    assert abs(price - bs_price) / bs_price < 0.01, "NumPy fallback price outside 1% of Black-Scholes"
+    print("✓ NumPy fallback test PASSED")
@@ -11,8 +11,11 @@ Usage:
 
 import sys
 import os
-import subprocess
+import shutil
+import time
+from functools import lru_cache
 import numpy as np
+import pytest
 
 # Add src directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
@@ -20,9 +23,43 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 from option_pricing import black_scholes_call
 from monte_carlo import monte_carlo_european_call
 
+# Imported at module level so MPI is initialized during collection, before
+# any Numba parallel kernel starts its thread pool (initializing MPI after
+# the TBB pool is up can hang the interpreter at exit)
+try:
+    from mpi4py import MPI
+    MPI_AVAILABLE = True
+except ImportError:
+    MPI_AVAILABLE = False
 
-def test_serial_implementation():
-    """Test that serial implementation works correctly."""
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+# Upper bound on spawned ranks, so large nodes don't turn the test into a
+# benchmark
+MAX_TEST_RANKS = 8
+
+# Seconds to wait for the spawned ranks to report back before failing
+SPAWN_TIMEOUT = 30
+
+
+def physical_core_count() -> int:
+    """Number of physical cores (logical CPUs if psutil is not installed)."""
+    cores = psutil.cpu_count(logical=False) if PSUTIL_AVAILABLE else None
+    return cores or os.cpu_count() or 1
+
+
+@lru_cache(maxsize=1)
+def run_serial_implementation():
+    """
+    Run the serial reference pricing once and return (price, stderr).
+    
+    Cached so the consistency test reuses the result of TEST 1 instead of
+    repeating the 100k-sample run.
+    """
     print("\n" + "=" * 70)
     print("TEST 1: Serial Implementation")
     print("=" * 70)
@@ -53,38 +90,50 @@ def test_serial_implementation():
     return mc_price, mc_stderr
 
 
-def test_mpi_implementation():
-    """Test that MPI implementation works with mpirun."""
+@lru_cache(maxsize=1)
+def run_mpi_implementation():
+    """
+    Spawn the MPI pricing once and return (price, stderr).
+    
+    Returns (None, None) when no MPI runtime is available. Raises
+    RuntimeError if the ranks cannot be spawned, report a failed run or do
+    not answer within SPAWN_TIMEOUT seconds.
+    
+    Cached so the consistency test reuses the result of TEST 2 instead of
+    spawning a second set of ranks.
+    """
     print("\n" + "=" * 70)
     print("TEST 2: MPI Implementation")
     print("=" * 70)
     
-    # Check if mpirun is available
-    try:
-        result = subprocess.run(['which', 'mpirun'], capture_output=True, text=True)
-        if result.returncode != 0:
-            print("⚠️  mpirun not found. Skipping MPI test.")
-            print("   Install OpenMPI to run MPI tests:")
-            print("   - macOS:  brew install open-mpi")
-            print("   - Ubuntu: sudo apt-get install openmpi-bin")
-            return None, None
-    except FileNotFoundError:
-        print("⚠️  Cannot check for mpirun. Skipping MPI test.")
+    # Spawning ranks needs an MPI runtime and mpi4py in this interpreter
+    if not MPI_AVAILABLE:
+        print("⚠️  mpi4py not found. Skipping MPI test.")
+        return None, None
+    if shutil.which('mpirun') is None:
+        print("⚠️  mpirun not found. Skipping MPI test.")
+        print("   Install OpenMPI to run MPI tests:")
+        print("   - macOS:  brew install open-mpi")
+        print("   - Ubuntu: sudo apt-get install openmpi-bin")
         return None, None
     
     S0, K, T, r, sigma = 100.0, 100.0, 1.0, 0.05, 0.20
     n_samples = 100000
     seed = 42
-    n_ranks = 4
+    # One rank per physical core, minus the slot this (parent) process
+    # already holds: Open MPI's default slot count is the core count, so
+    # asking for every core would be refused as oversubscription
+    cores = physical_core_count()
+    n_ranks = max(1, min(cores - 1, MAX_TEST_RANKS))
+    oversubscribed = n_ranks + 1 > cores
     
     print(f"Parameters: S0=${S0}, K=${K}, T={T}yr, r={r}, σ={sigma}")
     print(f"Samples: {n_samples:,}")
     print(f"MPI ranks: {n_ranks}")
     
-    # Construct command
-    cmd = [
-        'mpirun', '-n', str(n_ranks),
-        'python', 'src/mpi_monte_carlo.py',
+    script = os.path.join(os.path.dirname(__file__), '..', 'src', 'mpi_monte_carlo.py')
+    args = [
+        script,
         '--n-samples', str(n_samples),
         '--S0', str(S0),
         '--K', str(K),
@@ -95,41 +144,109 @@ def test_mpi_implementation():
         '--validate'
     ]
     
-    print(f"\nRunning: {' '.join(cmd)}")
+    print(f"\nSpawning {n_ranks} ranks: {sys.executable} {' '.join(args)}")
     print("-" * 70)
     
+    # Pin each rank to its own core (the Spawn equivalent of mpirun's
+    # --map-by core --bind-to core) and keep every rank single-threaded so
+    # Numba/BLAS pools don't over-thread the cores. On a single-core box
+    # the one rank has to share the parent's core, which Open MPI only
+    # allows with the OVERSUBSCRIBE / overload-allowed modifiers
+    info = MPI.Info.Create()
+    info.Set('map_by', 'core:OVERSUBSCRIBE' if oversubscribed else 'core')
+    info.Set('bind_to', 'core:overload-allowed' if oversubscribed else 'core')
+    info.Set('env', 'OMP_NUM_THREADS=1\nNUMBA_NUM_THREADS=1')
+    
+    # Spawn the ranks directly and receive (price, stderr) from child rank 0
+    # over the intercommunicator; no mpirun wrapper or stdout parsing
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-        print(result.stdout)
-        
-        if result.returncode != 0:
-            print(f"✗ MPI test FAILED with return code {result.returncode}")
-            if result.stderr:
-                print("Error output:")
-                print(result.stderr)
-            return None, None
-        
-        # Parse output to extract price (simple parsing)
-        for line in result.stdout.split('\n'):
-            if 'Monte Carlo price:' in line:
-                try:
-                    price_str = line.split('$')[1].strip()
-                    mpi_price = float(price_str)
-                    print(f"\n✓ MPI implementation test PASSED")
-                    print(f"  Extracted price: ${mpi_price:.6f}")
-                    return mpi_price, None
-                except (IndexError, ValueError):
-                    pass
-        
-        print("✓ MPI test completed (could not extract price for comparison)")
-        return None, None
-        
-    except subprocess.TimeoutExpired:
-        print("✗ MPI test TIMEOUT after 30 seconds")
-        return None, None
-    except Exception as e:
-        print(f"✗ MPI test ERROR: {e}")
-        return None, None
+        intercomm = MPI.COMM_SELF.Spawn(sys.executable, args=args, maxprocs=n_ranks, info=info)
+    except MPI.Exception as e:
+        raise RuntimeError(f"could not spawn {n_ranks} MPI ranks: {e}") from e
+    finally:
+        info.Free()
+    
+    # Poll a non-blocking receive against a deadline, so a crashed or hung
+    # child fails the test instead of blocking the session forever
+    result = np.full(2, np.nan)
+    request = intercomm.Irecv(result, source=0)
+    deadline = time.monotonic() + SPAWN_TIMEOUT
+    while not request.Test():
+        if time.monotonic() > deadline:
+            request.Cancel()
+            request.Wait()
+            # Free is local; Disconnect would wait on the unresponsive ranks
+            intercomm.Free()
+            raise RuntimeError(f"MPI ranks did not report a result within {SPAWN_TIMEOUT} s")
+        time.sleep(0.01)
+    
+    # The children send NaNs when their run failed (see mpi_monte_carlo.main)
+    if np.isnan(result).any():
+        intercomm.Free()
+        raise RuntimeError("MPI ranks reported a failed run")
+    intercomm.Disconnect()
+    
+    mpi_price, mpi_stderr = float(result[0]), float(result[1])
+    print(f"\n✓ MPI implementation test PASSED")
+    print(f"  Received price: ${mpi_price:.6f} ± ${mpi_stderr:.6f}")
+    return mpi_price, mpi_stderr
+
+
+def test_serial_implementation():
+    """Test that serial implementation works correctly."""
+    run_serial_implementation()
+
+
+def test_mpi_implementation():
+    """Test that MPI implementation works when spawned via MPI.Comm.Spawn."""
+    mpi_price, _ = run_mpi_implementation()
+    if mpi_price is None:
+        pytest.skip("MPI runtime (mpi4py and mpirun) not available")
+
+
+def test_mpi_rank_seed_streams():
+    """Test the per-rank random streams used by the MPI implementation."""
+    print("\n" + "=" * 70)
+    print("TEST 2b: MPI Per-Rank Random Streams")
+    print("=" * 70)
+    
+    from option_pricing import precompute_gbm_constants
+    from mc_kernels import mc_call_reduce
+    
+    S0, K, T, r, sigma = 100.0, 100.0, 1.0, 0.05, 0.20
+    n_samples = 100000
+    seed = 42
+    n_ranks = 4
+    
+    # Emulate mpi_monte_carlo's decomposition in-process: rank i draws its
+    # share from SeedSequence(seed).spawn(size)[i] (no mpirun needed)
+    drift, vol_sqrtT = precompute_gbm_constants(T, r, sigma)
+    
+    def pooled_price():
+        children = np.random.SeedSequence(seed).spawn(n_ranks)
+        sums = [mc_call_reduce(S0, K, drift, vol_sqrtT, n_samples // n_ranks, child)
+                for child in children]
+        total = sum(s for s, _ in sums)
+        total_sq = sum(s2 for _, s2 in sums)
+        mean = total / n_samples
+        std = np.sqrt(total_sq / n_samples - mean**2)
+        return np.exp(-r * T) * mean, np.exp(-r * T) * std / np.sqrt(n_samples), sums
+    
+    price, stderr, sums = pooled_price()
+    bs_price = black_scholes_call(S0, K, T, r, sigma)
+    
+    print(f"  Pooled price ({n_ranks} streams): ${price:.6f} ± ${stderr:.6f}")
+    print(f"  Black-Scholes:               ${bs_price:.6f}")
+    
+    # Distinct streams per rank (no duplicated samples across ranks)
+    assert len({s for s, _ in sums}) == n_ranks, "Rank streams are not independent"
+    
+    # Reproducible for a fixed seed
+    assert pooled_price()[0] == price, "Rank streams are not reproducible"
+    
+    assert abs(price - bs_price) < 3 * stderr, "Pooled rank price outside 3 sigma of Black-Scholes"
+    
+    print("✓ Rank stream test PASSED")
 
 
 def test_serial_vs_mpi_consistency():
@@ -141,13 +258,12 @@ def test_serial_vs_mpi_consistency():
     print("Comparing serial and MPI implementations with same seed...")
     print("Note: Results should be statistically similar (within confidence intervals)")
     
-    # Run both implementations
-    serial_price, serial_stderr = test_serial_implementation()
-    mpi_price, mpi_stderr = test_mpi_implementation()
+    # Reuse the results of TEST 1 and TEST 2 (cached; each runs only once)
+    serial_price, serial_stderr = run_serial_implementation()
+    mpi_price, mpi_stderr = run_mpi_implementation()
     
     if mpi_price is None:
-        print("\n⚠️  Could not compare: MPI test did not return price")
-        return False
+        pytest.skip("MPI runtime (mpi4py and mpirun) not available")
     
     # Compare results
     print("\n" + "=" * 70)
@@ -171,18 +287,11 @@ def test_serial_vs_mpi_consistency():
     # Test passes if:
     # 1. Difference is small (< 1% relative error)
     # 2. OR z-score < 3 (3-sigma rule)
-    if rel_diff_pct < 1.0 or z_score < 3.0:
-        print(f"\n✓ Consistency test PASSED")
-        print(f"  Serial and MPI implementations are statistically consistent")
-        return True
-    else:
-        print(f"\n⚠️  Consistency test WARNING")
-        print(f"  Difference is larger than expected")
-        print(f"  This could be due to:")
-        print(f"    - Different random number sequences")
-        print(f"    - Insufficient samples for accurate comparison")
-        print(f"    - Implementation differences")
-        return False
+    assert rel_diff_pct < 1.0 or z_score < 3.0, (
+        f"Serial and MPI prices differ by {rel_diff_pct:.4f}% (z = {z_score:.2f})"
+    )
+    print(f"\n✓ Consistency test PASSED")
+    print(f"  Serial and MPI implementations are statistically consistent")
 
 
 def run_all_tests():
@@ -194,10 +303,10 @@ def run_all_tests():
     
     try:
         # Test 1: Serial works
-        serial_price, serial_stderr = test_serial_implementation()
+        serial_price, serial_stderr = run_serial_implementation()
         
         # Test 2: MPI works
-        mpi_price, mpi_stderr = test_mpi_implementation()
+        mpi_price, mpi_stderr = run_mpi_implementation()
         
         # Summary
         print("\n" + "=" * 70)